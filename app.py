@@ -1,11 +1,25 @@
-from flask import Flask, request, jsonify
+import itertools
+import json
+import queue
+import threading
+import time
+from flask import Flask, Response, g, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
-import pandas as pd
 import numpy as np
-import tensorflow as tf
-import pythoncom
+import features
+import inference_backends
+import metrics
 import rustab_interaction
+import screening
+import solver_backend
+import trajectory_io
 from config import Config
+from jobs import JobManager
+from inference_scheduler import InferenceScheduler
+from model_metadata import ModelMetadataCache
+from result_cache import ResultCache
+from singleflight import SingleFlight
+from solver_pool import SolverPool
 from flask_cors import CORS
 
 app = Flask(__name__)
@@ -26,72 +40,350 @@ class Model(db.Model):
     input_width = db.Column(db.Integer, nullable=False)
     data_in_frame = db.Column(db.Integer)
 
-# Загрузка модели
-model = tf.keras.models.load_model('model.h5')
+def load_model_metadata() -> list:
+    """
+    Функция чтения параметров всех моделей из БД
+    :return: Список словарей {'name', 'input_width', 'data_in_frame'}
+    """
+    with app.app_context():
+        # Локальная SQLite создается при первом обращении
+        if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+            db.create_all()
+
+        return [{'name': row.name,
+                 'input_width': row.input_width,
+                 'data_in_frame': row.data_in_frame} for row in Model.query.all()]
+
+# Кэш параметров моделей: БД не опрашивается на каждый прогноз и читается при первом запросе
+model_metadata = ModelMetadataCache(load_model_metadata, app.config['MODEL_METADATA_TTL'])
+
+# Движок прогноза: Keras (tf.function или model.predict), ONNX или TFLite.
+# Создается при первом прогнозе, чтобы запуск процесса не ждал импорта TensorFlow
+engine = None
+engine_lock = threading.Lock()
+
+def get_engine() -> any:
+    """
+    Функция получения движка прогноза с созданием при первом обращении
+    :return: Движок прогноза
+    """
+    global engine
+
+    if engine is None:
+        with engine_lock:
+            if engine is None:
+                engine = inference_backends.create_engine(app.config)
+
+    return engine
+
+def predict_batch_for_model(key: tuple, batch: np.ndarray) -> np.ndarray:
+    """
+    Функция пакетного прогноза моделью из реестра
+    :param key: Ключ группы (имя модели, размерность входа)
+    :param batch: Пакет входов модели
+    :return: Выход модели
+    """
+    name, shape = key
+
+    with metrics.stage_timer('model_load'):
+        get_engine().get(name, shape[0])
+
+    with metrics.stage_timer('model_predict'):
+        return get_engine().predict(name, batch)
+
+# Планировщик, объединяющий одновременные запросы прогноза в пакеты
+scheduler = InferenceScheduler(predict_batch_for_model,
+                               app.config['INFERENCE_MAX_BATCH_SIZE'],
+                               app.config['INFERENCE_MAX_WAIT_MS'],
+                               app.config['INFERENCE_QUEUE_DEPTH'])
+
+# Шаблоны файлов
+SHABLON_SCN = "C:\\Users\\Umaro\\OneDrive\\Документы\\RastrWin3\\SHABLON\\сценарий.scn"
+SHABLON_DFW = "C:\\Users\\Umaro\\OneDrive\\Документы\\RastrWin3\\SHABLON\\автоматика.dfw"
+SHABLON_KPR = "C:\\Users\\Umaro\\OneDrive\\Документы\\RastrWin3\\SHABLON\\контр-е величины.kpr"
+
+# Хардкод
+NAME = "Богучанская ГЭС"
+NODE = 60533014
+DATA_SET = "Num=60533014"
+NAME_SUPPORT = "Красноярская ГЭС"
+DATA_SET_SUPPORT = "Num=60522003"
+
+BOGES_GENERATORS = {
+    "Богучанская ГЭС - Г1": 60533008,
+    "Богучанская ГЭС - Г2": 60533009,
+    "Богучанская ГЭС - Г3": 60533010,
+    "Богучанская ГЭС - Г4": 60533011,
+    "Богучанская ГЭС - Г5": 60533012,
+    "Богучанская ГЭС - Г6": 60533013,
+    "Богучанская ГЭС - Г7": 60533014,
+    "Богучанская ГЭС - Г8": 60533015,
+    "Богучанская ГЭС - Г9": 60533016,
+}
+
+# Каналы результата: угол исследуемого генератора и мощности генераторов станции
+POWER_CHANNELS = rustab_interaction.power_channels(BOGES_GENERATORS)
+TRANSIENT_CHANNELS = dict({'delta': ("Generator", "Delta", NODE)}, **POWER_CHANNELS)
+
+# Параметры интегрирования
+START_STEP, MIN_STEP, MAX_STEP, OUT_STEP = 0.01, 0.001, 0.5, 0.01
+
+# Этапы расчета динамики
+TRANSIENT_STAGES = ['file_prepare', 'calculate_dynamic', 'get_transient', 'preprocessing']
+
+# Пул процессов расчетного ядра для массовых расчетов (скрининг); создается при первом обращении
+solver_pool = None
+solver_pool_lock = threading.Lock()
+
+def get_solver_pool() -> SolverPool:
+    """
+    Функция получения пула процессов расчетного ядра с созданием при первом обращении
+    :return: Пул процессов
+    """
+    global solver_pool
+
+    if solver_pool is None:
+        with solver_pool_lock:
+            if solver_pool is None:
+                solver_pool = SolverPool(app.config['SOLVER_POOL_PROCESSES'])
+
+    return solver_pool
+
+# Фоновые задания расчета динамики
+jobs = JobManager(app.config['TRANSIENT_JOB_WORKERS'], app.config['TRANSIENT_JOB_HISTORY'])
+
+# Рабочая область RUSTab одна на процесс: расчеты выполняются по очереди в потоке - владельце
+# объекта COM, который создается в нем при первом расчете и не освобождается
+solver_thread = solver_backend.SolverThread()
+
+# Кэш результатов расчета динамики
+result_cache = ResultCache(app.config['RESULT_CACHE_DIR'], app.config['RESULT_CACHE_MAX_MB'] * 1024 * 1024)
+
+# Объединение одновременных одинаковых расчетов
+simulations = SingleFlight()
+
+# Порядковые номера результатов: у каждого расчета, синхронного или фонового, свой файл
+result_indexes = itertools.count(1)
+
+def run_transient_pipeline(rst_file: str, scn_file: str, input_width: float,
+                           result_index: int = None, output_format: str = 'npy',
+                           report=lambda stage: None) -> str:
+    """
+    Функция расчета динамики и подготовки результата
+    :param rst_file: Путь к файлу режима
+    :param scn_file: Путь к файлу сценария
+    :param input_width: Время моделирования
+    :param result_index: Порядковый номер результата (None - следующий свободный)
+    :param output_format: Формат файла результата: 'npy' (двоичный) или 'csv'
+    :param report: Функция отметки начала этапа
+    :return: Путь к файлу результата
+    """
+    if result_index is None:
+        result_index = next(result_indexes)
+
+    # Ключ результата: содержимое входных файлов, параметры расчета и контролируемых величин
+    cache_key = result_cache.key([rst_file, scn_file, SHABLON_SCN, SHABLON_DFW, SHABLON_KPR], {
+        'input_width': input_width,
+        'steps': [START_STEP, MIN_STEP, MAX_STEP, OUT_STEP],
+        'kpr': [NAME, DATA_SET, NAME_SUPPORT, DATA_SET_SUPPORT],
+        'channels': TRANSIENT_CHANNELS,
+        'generators': BOGES_GENERATORS,
+    })
+
+    save_path = rustab_interaction.result_path("БоГЭС", result_index)
+
+    def simulate() -> str:
+        """
+        Функция расчета динамики с сохранением результата в кэш
+        :return: Путь к результату в кэше
+        """
+        def run_stages() -> str:
+            """
+            Функция этапов расчета в потоке - владельце RUSTab
+            :return: Путь к результату в кэше
+            """
+            report('file_prepare')
+            with metrics.stage_timer('file_prepare'):
+                rustab_interaction.file_prepare(rst_file, scn_file, SHABLON_DFW, SHABLON_SCN, SHABLON_KPR,
+                                                NAME, DATA_SET, NAME_SUPPORT, DATA_SET_SUPPORT)
+
+            report('calculate_dynamic')
+            with metrics.stage_timer('calculate_dynamic'):
+                rustab_interaction.calculate_dynamic(input_width, START_STEP, MIN_STEP,
+                                                     MAX_STEP, OUT_STEP)
+
+            report('get_transient')
+            with metrics.stage_timer('get_transient'):
+                rustab_interaction.get_transient("Generator", "Delta", NODE, "БоГЭС",
+                                                 result_index, channels=POWER_CHANNELS)
+
+            report('preprocessing')
+            with metrics.stage_timer('preprocessing'):
+                rustab_interaction.preprocessing(save_path, save_path)
+
+            # Результат сохраняется в кэш из собственного файла расчета до следующего расчета
+            return result_cache.put(cache_key, save_path)
+
+        return solver_thread.call(run_stages)
+
+    try:
+        # Результат копируется из кэша под его блокировкой: вытеснение не удалит файл между
+        # поиском и копированием
+        if not result_cache.get_into(cache_key, save_path):
+            # Одинаковые одновременные запросы ожидают один расчет
+            with metrics.stage_timer('simulation'):
+                _, computed = simulations.do(cache_key, simulate)
+
+            # Результат ведущего запроса мог быть вытеснен до копирования - расчет повторяется
+            if not computed and not result_cache.get_into(cache_key, save_path):
+                with metrics.stage_timer('simulation'):
+                    simulate()
+
+        # CSV формируется из двоичного результата только по запросу
+        if output_format == 'csv':
+            return trajectory_io.export_csv(save_path)
+
+        return save_path
+
+    except Exception as ex:
+        raise Exception(str(ex))
+
+def transient_task(rst_file: str, scn_file: str, duration: float) -> dict:
+    """
+    Функция формирования задания расчета для пула процессов (solver_pool.simulate_scenario)
+    :param rst_file: Путь к файлу режима
+    :param scn_file: Путь к файлу сценария
+    :param duration: Время моделирования, с
+    :return: Задание с каналами delta, мощности генераторов и t
+    """
+    return {'rst_file': rst_file, 'scn_file': scn_file, 'dfw_file': SHABLON_DFW,
+            'shablon_scn': SHABLON_SCN, 'kpr_file': SHABLON_KPR,
+            'name': NAME, 'data_set': DATA_SET,
+            'name_support': NAME_SUPPORT, 'set_support': DATA_SET_SUPPORT,
+            'dynamic': {'input_width': duration, 'start_step': START_STEP, 'min_step': MIN_STEP,
+                        'max_step': MAX_STEP, 'out_step': OUT_STEP},
+            'channels': TRANSIENT_CHANNELS}
+
+def simulate_transient(rst_file: str, scn_file: str, duration: float,
+                       mark=lambda stage: None) -> np.ndarray:
+    """
+    Функция расчета динамики с получением каналов результата в памяти
+    :param rst_file: Путь к файлу режима
+    :param scn_file: Путь к файлу сценария
+    :param duration: Время моделирования, с
+    :param mark: Функция отметки завершения этапа
+    :return: Массив строк (delta, мощности генераторов, t)
+    """
+    def run_stages() -> np.ndarray:
+        """
+        Функция этапов расчета в потоке - владельце RUSTab
+        :return: Массив строк (delta, мощности генераторов, t)
+        """
+        rustab_interaction.file_prepare(rst_file, scn_file, SHABLON_DFW, SHABLON_SCN, SHABLON_KPR,
+                                        NAME, DATA_SET, NAME_SUPPORT, DATA_SET_SUPPORT)
+        mark('file_prepare')
+
+        rustab_interaction.calculate_dynamic(duration, START_STEP, MIN_STEP,
+                                             MAX_STEP, OUT_STEP)
+        mark('calculate_dynamic')
+
+        transient, _ = rustab_interaction.get_transient_channels(TRANSIENT_CHANNELS)
+        mark('get_transient')
+
+        return transient
+
+    return solver_thread.call(run_stages)
+
+def prepare_window(transient: np.ndarray, input_t: int) -> tuple:
+    """
+    Функция предобработки окна наблюдения в памяти
+    :param transient: Массив строк (delta, мощности генераторов, t)
+    :param input_t: Входное окно
+    :return: Нормализованное окно размерности (input_t, 4) и масштаб признаков (2, 4)
+    """
+    data, scaler = features.preprocess(transient, list(TRANSIENT_CHANNELS) + ['t'])
+    window = np.ascontiguousarray(data[0:input_t])
+
+    if window.shape[0] != input_t:
+        raise Exception(f"Simulation gave less than {input_t} points")
+
+    return window, scaler
 
 @app.route('/get-transient', methods=['POST'])
 def get_transient():
     """
-    Функция представление для старта расчета динамики
+    Функция представление для старта расчета динамики.
+    При {"async": true} расчет ставится в очередь заданий
     :return: JSON типа {'message': 'Model trained successfully',
                         'path': Путь к файлу результата}
+             или {'job_id': идентификатор задания, 'status_url': адрес состояния}
     """
-    try:
-        pythoncom.CoInitialize()
+    # Получение файла режима
+    rst_file = request.json['rst_file']
+
+    # Получение файла сценария
+    scn_file = request.json['scn_file']
+
+    # Получение времени моделирования
+    input_width = request.json['input_width']
 
-        # Получение файла режима
-        rst_file = request.json['rst_file']
+    # Формат файла результата: CSV только по запросу
+    output_format = request.json.get('format', 'npy')
 
-        # Получение файла сценария
-        scn_file = request.json['scn_file']
+    if output_format not in ('npy', 'csv'):
+        return jsonify({'error': f'Unknown format {output_format}'}), 400
 
-        # Получение времени моделирования
-        input_width = request.json['input_width']
+    if request.json.get('async', False):
+        job_id = jobs.submit(run_transient_pipeline, TRANSIENT_STAGES,
+                             rst_file, scn_file, input_width, next(result_indexes),
+                             output_format)
 
-        # Шаблоны файлов
-        shablon_scn = "C:\\Users\\Umaro\\OneDrive\\Документы\\RastrWin3\\SHABLON\\сценарий.scn"
-        shablon_dfw = "C:\\Users\\Umaro\\OneDrive\\Документы\\RastrWin3\\SHABLON\\автоматика.dfw"
-        shablon_kpr = "C:\\Users\\Umaro\\OneDrive\\Документы\\RastrWin3\\SHABLON\\контр-е величины.kpr"
+        return jsonify({'job_id': job_id,
+                        'status_url': f'/jobs/{job_id}'}), 202
 
-        # Хардкод
-        name = "Богучанская ГЭС"
-        node = 60533014
-        data_set = "Num=60533014"
-        name_support = "Красноярская ГЭС"
-        data_set_support = "Num=60522003"
+    save_path = run_transient_pipeline(rst_file, scn_file, input_width,
+                                       output_format=output_format)
 
-        try:
-            rustab_interaction.file_prepare(rst_file, scn_file, shablon_dfw, shablon_scn, shablon_kpr,
-                                            name, data_set, name_support, data_set_support)
+    return jsonify({'message': 'Model trained successfully',
+                    'path': save_path}), 200
 
-            rustab_interaction.calculate_dynamic(input_width, 0.01, 0.001,
-                                                 0.5, 0.01)
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Функция представление для получения состояния задания расчета динамики
+    :param job_id: Идентификатор задания
+    :return: JSON типа {'id', 'status', 'stages', 'result': путь к файлу результата, 'error'}
+    """
+    job = jobs.get(job_id)
 
-            save_path = rustab_interaction.get_transient("Generator", "Delta",
-                                                         node, "БоГЭС", 1)
+    if job is None:
+        return jsonify({'error': 'No job with this id exists'}), 404
 
-            boges_generators = {
-                "Богучанская ГЭС - Г1": 60533008,
-                "Богучанская ГЭС - Г2": 60533009,
-                "Богучанская ГЭС - Г3": 60533010,
-                "Богучанская ГЭС - Г4": 60533011,
-                "Богучанская ГЭС - Г5": 60533012,
-                "Богучанская ГЭС - Г6": 60533013,
-                "Богучанская ГЭС - Г7": 60533014,
-                "Богучанская ГЭС - Г8": 60533015,
-                "Богучанская ГЭС - Г9": 60533016,
-            }
+    return jsonify(job), 200
 
-            rustab_interaction.preprocessing(save_path, save_path, boges_generators, rst_file)
+def denormalize_predictions(predictions: np.ndarray, t: int, input_t: int,
+                            scalers: np.ndarray = None) -> np.ndarray:
+    """
+    Функция денормализации прогноза по столбцам delta, w, a, p
+    :param predictions: Выход модели размерности (n, (t - input_t) * 4)
+    :param t: Количество точек в датафрейме
+    :param input_t: Входное окно
+    :param scalers: Масштабы признаков процессов (n, 2, 4), сохраненные при предобработке.
+                    Для процессов без масштаба (NaN) используется масштаб самого прогноза
+    :return: Массив размерности (n, t - input_t, 4)
+    """
+    predictions = predictions.reshape(-1, t - input_t, 4)
 
-        except Exception as ex:
-            raise Exception(str(ex))
+    if scalers is None:
+        scalers = np.full((len(predictions), 2, 4), np.nan)
 
-        return jsonify({'message': 'Model trained successfully',
-                        'path': save_path}), 200
+    # Прежнее поведение для файлов, предобработанных без сохранения масштаба
+    missing = np.isnan(scalers[:, 0, 0])
+    if missing.any():
+        scalers = np.array(scalers, dtype=float)
+        scalers[missing] = features.fit_scaler(predictions[missing].transpose(1, 0, 2)).transpose(1, 0, 2)
 
-    finally:
-        pythoncom.CoUninitialize()
+    return features.denormalize(predictions, scalers)
 
 @app.route('/predict', methods=['POST'])
 def predict():
@@ -103,45 +395,43 @@ def predict():
     path = request.json['path']
     name = request.json['name']
 
-    data = rustab_interaction.parse_csv_to_array(path)
-
-    # Получение значения из БД
-    model_params = Model.query.filter_by(name=name).first()
+    # Получение значения из кэша параметров моделей
+    with metrics.stage_timer('metadata_lookup'):
+        model_params = model_metadata.get(name)
 
     # Если первичный ключ не найден
     if not model_params:
         return jsonify({'error': 'No model with this id exists'}), 400
 
     # Количество точек в датафрейме
-    t = model_params.data_in_frame
+    t = model_params['data_in_frame']
 
     # Входное окно
-    input_t = model_params.input_width
-
-    # Преобразование списка в датафрейм
-    df = pd.DataFrame(data)
+    input_t = model_params['input_width']
 
-    # Формируем слайс из первых input_t точек
-    test_csv_pred = df.iloc[0:input_t].to_numpy()
-    test_csv_pred = np.expand_dims(test_csv_pred, axis=0)
+    # Читаем только первые input_t точек и масштаб признаков из описания
+    try:
+        with metrics.stage_timer('read_trajectory'):
+            window = trajectory_io.read_trajectory(path, rows=input_t)
+            scaler = trajectory_io.read_scaler(path)
 
-    # Выполняем прогноз
-    predictions = model.predict(test_csv_pred)
+    except (OSError, ValueError) as ex:
+        return jsonify({'error': str(ex)}), 400
 
-    # Преобразуем данные прогноза
-    predictions_df = predictions.reshape(t - input_t, 4)
+    if window.shape[0] != input_t:
+        return jsonify({'error': f'File has less than {input_t} points'}), 400
 
-    # Создаем датафрейм с предсказанными данными
-    predictions_df_ar = pd.DataFrame(data=predictions_df, columns=['delta', 'w', 'a', 'p'])
+    # Выполняем прогноз в общем пакете с одновременными запросами
+    try:
+        with metrics.stage_timer('inference'):
+            predictions = scheduler.submit((name, window.shape), window).result()
 
-    # Денормализация данных
-    for column in predictions_df_ar.columns:
-        min_value = predictions_df_ar[column].min()
-        max_value = predictions_df_ar[column].max()
-        predictions_df_ar[column] = predictions_df_ar[column] * (max_value - min_value) + min_value
+    except queue.Full:
+        return jsonify({'error': 'Inference queue is full'}), 503
 
-    # Преобразуем датафрейм в список списков
-    result = predictions_df_ar.to_numpy().tolist()
+    # Преобразуем и денормализуем данные прогноза сохраненным масштабом
+    result = denormalize_predictions(predictions, t, input_t,
+                                     None if scaler is None else scaler[np.newaxis])[0].tolist()
 
     # Объединение прогноза и входных данных
     #rustab_interaction.add_array_to_csv(result, path)
@@ -149,5 +439,299 @@ def predict():
     # Возвращаем результат как JSON
     return jsonify({"result": result, "path": path}), 200
 
+@app.route('/predict-batch', methods=['POST'])
+def predict_batch():
+    """
+    Функция представление для пакетного прогноза нескольких переходных процессов одной моделью
+    :return: JSON типа {"results": [{"result": результат прогноза, "path": путь к файлу}, ...]}
+    """
+    # Получение данных из запроса: пути к файлам и/или массивы окон наблюдения
+    # (с необязательными масштабами признаков [[минимумы], [максимумы]])
+    name = request.json['name']
+    paths = request.json.get('paths', [])
+    arrays = request.json.get('arrays', [])
+    array_scalers = request.json.get('scalers') or [None] * len(arrays)
+
+    if not paths and not arrays:
+        return jsonify({'error': 'No paths or arrays given'}), 400
+
+    # Получение значения из кэша параметров моделей
+    model_params = model_metadata.get(name)
+
+    # Если первичный ключ не найден
+    if not model_params:
+        return jsonify({'error': 'No model with this id exists'}), 400
+
+    # Количество точек в датафрейме
+    t = model_params['data_in_frame']
+
+    # Входное окно
+    input_t = model_params['input_width']
+
+    # Из файлов читаются только первые input_t точек
+    try:
+        sources = [trajectory_io.read_trajectory(path, rows=input_t) for path in paths] + arrays
+        scalers = [trajectory_io.read_scaler(path) for path in paths] + array_scalers
+
+    except (OSError, ValueError) as ex:
+        return jsonify({'error': str(ex)}), 400
+
+    # Масштабы процессов (n, 2, 4); NaN - масштаб не сохранен
+    scalers = np.stack([np.full((2, 4), np.nan) if scaler is None else np.asarray(scaler, dtype=float)
+                        for scaler in scalers])
+
+    # Формируем пакет из первых input_t точек каждого процесса
+    windows = []
+    for position, data in enumerate(sources):
+        window = np.asarray(data, dtype=np.float32)[0:input_t]
+
+        if window.ndim != 2 or window.shape[0] != input_t:
+            return jsonify({'error': f'Item {position} has less than {input_t} points'}), 400
+
+        windows.append(window)
+
+    # Выполняем прогноз одним проходом модели
+    predictions = predict_batch_for_model((name, (input_t, 4)), np.stack(windows))
+
+    results = denormalize_predictions(predictions, t, input_t, scalers).tolist()
+    item_paths = paths + [None] * len(arrays)
+
+    # Возвращаем результаты в порядке запроса
+    return jsonify({"results": [{"result": result, "path": path}
+                                for result, path in zip(results, item_paths)]}), 200
+
+@app.route('/forecast', methods=['POST'])
+def forecast():
+    """
+    Функция представление для расчета окна наблюдения и прогноза оставшейся части
+    переходного процесса без промежуточных файлов
+    :return: JSON типа {"observed": окно наблюдения, "predicted": прогноз,
+                        "timings": {этап: время, с}}; окно и прогноз (delta, w, a, p)
+             в исходных единицах
+    """
+    # Получение данных из запроса
+    rst_file = request.json['rst_file']
+    scn_file = request.json['scn_file']
+    name = request.json['name']
+
+    timings = {}
+    started = time.perf_counter()
+
+    def mark(stage: str) -> None:
+        """
+        Функция фиксации длительности этапа
+        :param stage: Наименование завершенного этапа
+        :return: None
+        """
+        nonlocal started
+        now = time.perf_counter()
+        timings[stage] = now - started
+        started = now
+
+    # Получение значения из кэша параметров моделей
+    model_params = model_metadata.get(name)
+
+    # Если первичный ключ не найден
+    if not model_params:
+        return jsonify({'error': 'No model with this id exists'}), 400
+
+    # Количество точек в датафрейме
+    t = model_params['data_in_frame']
+
+    # Входное окно
+    input_t = model_params['input_width']
+
+    mark('metadata')
+
+    # Моделируется только окно наблюдения
+    transient = simulate_transient(rst_file, scn_file, input_t * OUT_STEP, mark)
+
+    # Предобработка в памяти
+    window, scaler = prepare_window(transient, input_t)
+    mark('preprocessing')
+
+    # Выполняем прогноз в общем пакете с одновременными запросами
+    try:
+        predictions = scheduler.submit((name, window.shape), window).result()
+
+    except queue.Full:
+        return jsonify({'error': 'Inference queue is full'}), 503
+
+    result = denormalize_predictions(predictions, t, input_t, scaler[np.newaxis])[0].tolist()
+    mark('predict')
+
+    return jsonify({"observed": features.denormalize(window, scaler).tolist(),
+                    "predicted": result,
+                    "timings": timings}), 200
+
+@app.route('/screen', methods=['POST'])
+def screen():
+    """
+    Функция представление для скрининга списка сценариев: прогноз по окну наблюдения
+    и полный расчет только для сценариев, близких к неустойчивости
+    :return: JSON типа {'job_id': идентификатор задания, 'status_url': адрес состояния}
+    """
+    # Получение данных из запроса
+    rst_file = request.json['rst_file']
+    scenarios = request.json['scenarios']
+    names = request.json.get('models') or [request.json['name']]
+    delta_limit = request.json.get('delta_limit', 180.0)
+    margin = request.json.get('margin', 0.9)
+    spread_limit = request.json.get('spread_limit')
+
+    # Получение значений из кэша параметров моделей
+    models_params = [model_metadata.get(name) for name in names]
+
+    if not all(models_params):
+        return jsonify({'error': 'No model with this id exists'}), 400
+
+    # Модели ансамбля должны иметь одинаковые окна
+    if len({(params['input_width'], params['data_in_frame']) for params in models_params}) != 1:
+        return jsonify({'error': 'Ensemble models have different windows'}), 400
+
+    t = models_params[0]['data_in_frame']
+    input_t = models_params[0]['input_width']
+    full_duration = request.json.get('full_duration', t * OUT_STEP)
+
+    def observe(scn_files: list) -> list:
+        """
+        Функция параллельного расчета окон наблюдения сценариев в пуле процессов
+        :param scn_files: Пути к файлам сценариев
+        :return: Список (угол в окне наблюдения, нормализованное окно, масштаб окна) в порядке сценариев
+        """
+        tasks = [dict(transient_task(rst_file, scn_file, input_t * OUT_STEP), position=position)
+                 for position, scn_file in enumerate(scn_files)]
+        observations = [None] * len(tasks)
+
+        for result in get_solver_pool().simulate(tasks):
+            if result['error'] is not None:
+                raise Exception(f"Сценарий {result['task']['scn_file']}: {result['error']}")
+
+            transient = result['result']
+            observations[result['task']['position']] = (transient[0:input_t, 0],
+                                                        *prepare_window(transient, input_t))
+
+        return observations
+
+    def predict(windows: np.ndarray) -> np.ndarray:
+        """
+        Функция прогноза угла всеми моделями ансамбля
+        :param windows: Пакет окон наблюдения
+        :return: Нормализованный прогноз угла (модели, сценарии, точки)
+        """
+        # Угол в градусах восстанавливается по масштабу входа модели (screening.estimate_delta)
+        return np.stack([predict_batch_for_model((name, (input_t, 4)), windows).reshape(-1, t - input_t, 4)[:, :, 0]
+                         for name in names])
+
+    def simulate_full(scn_file: str) -> np.ndarray:
+        """
+        Функция полного расчета сценария
+        :param scn_file: Путь к файлу сценария
+        :return: Угол на всем интервале моделирования
+        """
+        return simulate_transient(rst_file, scn_file, full_duration)[:, 0]
+
+    job_id = jobs.submit(screening.screen_contingencies, screening.SCREENING_STAGES,
+                         scenarios, observe, predict, simulate_full, delta_limit,
+                         margin, spread_limit)
+
+    return jsonify({'job_id': job_id,
+                    'status_url': f'/jobs/{job_id}'}), 202
+
+@app.route('/models/invalidate', methods=['POST'])
+def invalidate_models():
+    """
+    Функция представление для перечитывания параметров моделей из БД
+    :return: JSON типа {"models": количество моделей}
+    """
+    return jsonify({"models": model_metadata.refresh()}), 200
+
+def collect_metrics() -> list:
+    """
+    Функция сбора мгновенных значений для /metrics
+    :return: Список (наименование, метки, значение)
+    """
+    cache_stats = result_cache.stats()
+    scheduler_stats = scheduler.stats()
+    engine_stats = engine.stats() if engine is not None else {'models': [], 'bytes': 0}
+
+    return [
+        ('result_cache_hits', {}, cache_stats['hits']),
+        ('result_cache_misses', {}, cache_stats['misses']),
+        ('result_cache_entries', {}, cache_stats['entries']),
+        ('result_cache_bytes', {}, cache_stats['bytes']),
+        ('inference_queue_depth', {}, scheduler_stats['queue_depth']),
+        ('loaded_models', {}, len(engine_stats['models'])),
+        ('loaded_models_bytes', {}, engine_stats['bytes']),
+        ('model_metadata_entries', {}, len(model_metadata.entries)),
+        ('simulations_in_flight', {}, simulations.in_flight()),
+    ]
+
+metrics.registry.register_collector(collect_metrics)
+
+@app.before_request
+def enable_request_timings():
+    """
+    Функция включения разбивки времени по этапам для запросов с ?timings=1.
+    Для остальных запросов разбивка явно выключается
+    :return: None
+    """
+    g.timings_token = metrics.start_request_timings(request.args.get('timings') in ('1', 'true'))
+
+@app.teardown_request
+def reset_request_timings(exception=None):
+    """
+    Функция восстановления значения разбивки времени после запроса:
+    следующий запрос того же потока не получит этапы текущего
+    :param exception: Исключение запроса
+    :return: None
+    """
+    token = g.pop('timings_token', None)
+
+    if token is not None:
+        metrics.finish_request_timings(token)
+
+@app.after_request
+def attach_request_timings(response):
+    """
+    Функция добавления разбивки времени по этапам в JSON-ответ
+    :param response: Ответ представления
+    :return: Ответ с ключом 'timings'
+    """
+    timings = metrics.get_request_timings()
+
+    if timings is not None and response.is_json:
+        payload = response.get_json()
+
+        if isinstance(payload, dict):
+            payload.setdefault('timings', timings)
+            response.set_data(json.dumps(payload, ensure_ascii=False))
+
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Функция представление для метрик сервиса в формате Prometheus
+    :return: Текст метрик
+    """
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/result-cache-stats', methods=['GET'])
+def result_cache_stats():
+    """
+    Функция представление для статистики кэша результатов расчета динамики
+    :return: JSON типа {"hits", "misses", "entries", "bytes"}
+    """
+    return jsonify(result_cache.stats()), 200
+
+@app.route('/inference-stats', methods=['GET'])
+def inference_stats():
+    """
+    Функция представление для статистики пакетного прогноза
+    :return: JSON с глубиной очереди и гистограммами размеров пакетов и времени ожидания
+    """
+    return jsonify(dict(scheduler.stats(), engine=engine.stats() if engine is not None else None)), 200
+
 if __name__ == '__main__':
     app.run(debug=True, port=5007)
\ No newline at end of file
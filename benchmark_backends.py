@@ -0,0 +1,95 @@
+import argparse
+import os
+
+import numpy as np
+
+import trajectory_io
+from benchmark_inference import measure
+from features import FEATURE_COLUMNS
+from inference_backends import QUANTIZATIONS, KerasEngine, OnnxEngine, TfliteEngine, artifact_path
+
+
+def reference_windows(paths: list, input_width: int, data_in_frame: int) -> tuple:
+    """
+    Функция формирования окон из эталонных переходных процессов
+    :param paths: Пути к предобработанным процессам (.npy или .csv)
+    :param input_width: Входное окно модели
+    :param data_in_frame: Количество точек в окне (вход и прогноз)
+    :return: Входы (процессы, input_width, 4) и эталонные продолжения (процессы, data_in_frame - input_width, 4)
+    """
+    frames = np.stack([trajectory_io.read_trajectory(path, rows=data_in_frame, columns=FEATURE_COLUMNS)
+                       for path in paths]).astype(np.float32)
+
+    return frames[:, :input_width], frames[:, input_width:]
+
+def compare_backends(source: str, paths: list, input_width: int, data_in_frame: int,
+                     variants: list, repeats: int) -> list:
+    """
+    Функция сравнения точности и задержки форматов прогноза относительно модели Keras
+    :param source: Путь к файлу модели Keras
+    :param paths: Пути к эталонным процессам
+    :param input_width: Входное окно модели
+    :param data_in_frame: Количество точек в окне
+    :param variants: Пары (формат, вариант весов)
+    :param repeats: Количество замеров задержки
+    :return: Список словарей с результатами
+    """
+    from model_registry import ModelRegistry
+
+    inputs, targets = reference_windows(paths, input_width, data_in_frame)
+    artifacts = {'reference': source}
+
+    engines = {('keras', ''): KerasEngine(ModelRegistry('', source, artifacts))}
+    for backend, quantization in variants:
+        engine_class = OnnxEngine if backend == 'onnx' else TfliteEngine
+        engines[(backend, quantization)] = engine_class('', source, artifacts, quantization, threads=1)
+
+    baseline = engines[('keras', '')].predict('reference', inputs)
+
+    results = []
+    for (backend, quantization), engine in engines.items():
+        try:
+            predictions = np.asarray(engine.predict('reference', inputs))
+
+        except Exception as ex:
+            print(f"{backend} {quantization or 'float32'}: прогноз не выполнен {ex}")
+            continue
+
+        horizon = min(predictions.shape[1], targets.shape[1]) if predictions.ndim == 3 else 0
+        latency = measure(lambda x: engine.predict('reference', x), inputs[:1], repeats)
+
+        results.append({'backend': backend,
+                        'quantization': quantization or 'float32',
+                        'size_mb': (0.0 if backend == 'keras' else
+                                    engine.stats()['bytes'] / 1024 / 1024),
+                        'max_abs_vs_keras': float(np.abs(predictions - baseline).max()),
+                        'mae_vs_keras': float(np.abs(predictions - baseline).mean()),
+                        'mae_vs_reference': (float(np.abs(predictions[:, :horizon] -
+                                                          targets[:, :horizon, :predictions.shape[2]]).mean())
+                                             if horizon else float('nan')),
+                        'p50_ms': latency['p50_ms'],
+                        'p95_ms': latency['p95_ms']})
+
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Точность и задержка форматов прогноза на эталонных процессах")
+    parser.add_argument('--model', default='model.h5', help="Путь к файлу модели Keras")
+    parser.add_argument('--input-width', type=int, required=True, help="Входное окно модели")
+    parser.add_argument('--data-in-frame', type=int, required=True, help="Количество точек в окне")
+    parser.add_argument('--trajectories', nargs='+', required=True, help="Эталонные процессы (.npy или .csv)")
+    parser.add_argument('--repeats', type=int, default=200, help="Количество замеров задержки")
+    args = parser.parse_args()
+
+    # Сравниваются все экспортированные варианты, найденные рядом с моделью
+    found = [(backend, quantization) for backend in ('onnx', 'tflite') for quantization in QUANTIZATIONS
+             if os.path.isfile(artifact_path(args.model, backend, quantization))]
+
+    rows = compare_backends(args.model, args.trajectories, args.input_width, args.data_in_frame,
+                            found, args.repeats)
+
+    print(f"{'backend':<9}{'weights':<9}{'MB':>8}{'max|d|':>10}{'MAE':>10}{'MAE ref':>10}{'p50, ms':>10}{'p95, ms':>10}")
+    for row in rows:
+        print(f"{row['backend']:<9}{row['quantization']:<9}{row['size_mb']:>8.2f}"
+              f"{row['max_abs_vs_keras']:>10.5f}{row['mae_vs_keras']:>10.5f}{row['mae_vs_reference']:>10.5f}"
+              f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}")
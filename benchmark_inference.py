@@ -0,0 +1,82 @@
+import argparse
+import time
+
+import numpy as np
+
+from inference_engine import InferenceEngine
+from model_registry import ModelRegistry
+
+
+def measure(predict, batch: np.ndarray, repeats: int) -> dict:
+    """
+    Функция замера задержки прогноза
+    :param predict: Функция прогноза predict(пакет) -> выход модели
+    :param batch: Пакет входов модели
+    :param repeats: Количество замеров
+    :return: Словарь {'p50_ms', 'p95_ms', 'mean_ms'}
+    """
+    # Прогрев вне замера
+    predict(batch)
+
+    durations = np.empty(repeats)
+    for position in range(repeats):
+        started = time.perf_counter()
+        predict(batch)
+        durations[position] = time.perf_counter() - started
+
+    durations *= 1000
+    return {'p50_ms': float(np.percentile(durations, 50)),
+            'p95_ms': float(np.percentile(durations, 95)),
+            'mean_ms': float(durations.mean())}
+
+def run_benchmark(artifact: str, input_width: int, batch_sizes: list, repeats: int) -> list:
+    """
+    Функция сравнения model.predict и скомпилированного прогноза (без и с XLA)
+    :param artifact: Путь к файлу модели
+    :param input_width: Входное окно модели
+    :param batch_sizes: Размеры пакетов
+    :param repeats: Количество замеров
+    :return: Список словарей с результатами
+    """
+    registry = ModelRegistry('', artifact, {'benchmark': artifact})
+    model = registry.get('benchmark', input_width)
+
+    engines = {'tf.function': InferenceEngine(registry),
+               'tf.function+xla': InferenceEngine(registry, jit_compile=True)}
+
+    results = []
+    for batch_size in batch_sizes:
+        batch = np.random.default_rng(0).random((batch_size, input_width, 4), dtype=np.float32)
+
+        baseline = model.predict(batch, batch_size=len(batch), verbose=0)
+
+        results.append(dict(measure(lambda x: model.predict(x, batch_size=len(x), verbose=0),
+                                    batch, repeats), path='model.predict', batch=batch_size, max_abs_diff=0.0))
+
+        for path, engine in engines.items():
+            try:
+                # Расхождение с model.predict: скомпилированный путь не должен менять результат
+                difference = float(np.abs(engine.predict('benchmark', batch) - baseline).max())
+
+                results.append(dict(measure(lambda x: engine.predict('benchmark', x), batch, repeats),
+                                    path=path, batch=batch_size, max_abs_diff=difference))
+
+            except Exception as ex:
+                print(f"{path}: прогноз не выполнен {ex}")
+
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Задержка прогноза: model.predict и tf.function")
+    parser.add_argument('--model', default='model.h5', help="Путь к файлу модели")
+    parser.add_argument('--input-width', type=int, required=True, help="Входное окно модели")
+    parser.add_argument('--batch', type=int, nargs='+', default=[1, 8, 64], help="Размеры пакетов")
+    parser.add_argument('--repeats', type=int, default=200, help="Количество замеров")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.model, args.input_width, args.batch, args.repeats)
+
+    print(f"{'path':<18}{'batch':>7}{'p50, ms':>10}{'p95, ms':>10}{'mean, ms':>10}{'max|d|':>10}")
+    for row in rows:
+        print(f"{row['path']:<18}{row['batch']:>7}{row['p50_ms']:>10.2f}"
+              f"{row['p95_ms']:>10.2f}{row['mean_ms']:>10.2f}{row['max_abs_diff']:>10.1e}")
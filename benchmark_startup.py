@@ -0,0 +1,72 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+# Модули, тяжелые при импорте: их наличие после запуска означает неотложенную инициализацию
+HEAVY_MODULES = ['tensorflow', 'win32com', 'pythoncom', 'onnxruntime', 'sqlalchemy']
+
+# Программа замера в отдельном процессе: время импорта и загруженные тяжелые модули
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+imported = time.perf_counter() - started
+print(json.dumps({{'seconds': imported,
+                   'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, repeats: int, env: dict = None) -> dict:
+    """
+    Функция замера времени импорта модуля в новом процессе
+    :param module: Имя модуля
+    :param repeats: Количество запусков
+    :param env: Переменные окружения процесса
+    :return: Словарь {'module', 'p50_s', 'max_s', 'heavy'}
+    """
+    durations = []
+    heavy = []
+
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, env=env,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+
+        if output.returncode != 0:
+            raise Exception(f"Импорт {module} завершился ошибкой: {output.stderr.strip()}")
+
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        durations.append(result['seconds'])
+        heavy = result['heavy']
+
+    return {'module': module,
+            'p50_s': float(np.median(durations)),
+            'max_s': float(np.max(durations)),
+            'heavy': heavy}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Время запуска процессов сервиса")
+    parser.add_argument('--modules', nargs='+', default=['rustab_interaction', 'solver_pool', 'app'],
+                        help="Замеряемые модули")
+    parser.add_argument('--repeats', type=int, default=5, help="Количество запусков")
+    parser.add_argument('--backend', default=None, help="Расчетное ядро (RASTR_BACKEND)")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.backend:
+        env['RASTR_BACKEND'] = args.backend
+
+    print(f"{'module':<22}{'p50, s':>9}{'max, s':>9}  heavy modules")
+    for module in args.modules:
+        try:
+            row = measure_import(module, args.repeats, env)
+
+        except Exception as ex:
+            print(f"{module:<22}{'-':>9}{'-':>9}  {ex}")
+            continue
+
+        print(f"{row['module']:<22}{row['p50_s']:>9.3f}{row['max_s']:>9.3f}  {', '.join(row['heavy']) or '-'}")
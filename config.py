@@ -1,3 +1,44 @@
+import os
+
+
 class Config:
-    SQLALCHEMY_DATABASE_URI = 'postgresql://postgres:Frederick 1991@localhost:5432/modelling_db'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    # Локально вместо PostgreSQL можно указать DATABASE_URL=sqlite:///modelling.db
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL',
+                                             'postgresql://postgres:Frederick 1991@localhost:5432/modelling_db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Фоновые задания расчета динамики (RUSTab - один экземпляр на процесс)
+    TRANSIENT_JOB_WORKERS = 1
+    TRANSIENT_JOB_HISTORY = 1000
+
+    # Пул процессов расчетного ядра для скрининга (None - по числу ядер)
+    SOLVER_POOL_PROCESSES = int(os.environ['SOLVER_POOL_PROCESSES']) if 'SOLVER_POOL_PROCESSES' in os.environ else None
+
+    # Пакетирование одновременных запросов прогноза
+    INFERENCE_MAX_BATCH_SIZE = 64
+    INFERENCE_MAX_WAIT_MS = 5
+    INFERENCE_QUEUE_DEPTH = 1024
+
+    # Формат прогноза: keras, onnx или tflite (model.h5 -> model[.float16|.int8].onnx)
+    INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'keras')
+    INFERENCE_QUANTIZATION = os.environ.get('INFERENCE_QUANTIZATION', '')
+    INFERENCE_THREADS = int(os.environ.get('INFERENCE_THREADS', '0'))
+
+    # Прогноз Keras через tf.function с фиксированной сигнатурой; XLA - по переменной окружения.
+    # Замер benchmark_inference.py (окно 36, 1 CPU): p50 2.6-4.5 мс против 139-146 мс у model.predict
+    INFERENCE_COMPILED = True
+    INFERENCE_XLA = os.environ.get('INFERENCE_XLA', '0') == '1'
+
+    # Реестр моделей прогноза: models/<name>.h5, иначе общий model.h5
+    MODEL_DIR = 'models'
+    MODEL_DEFAULT_ARTIFACT = 'model.h5'
+    MODEL_ARTIFACTS = {}
+    MODEL_CACHE_SIZE = 4
+    MODEL_CACHE_MAX_MB = 1024
+
+    # Время актуальности кэша параметров моделей, с
+    MODEL_METADATA_TTL = 60
+
+    # Кэш результатов расчета динамики
+    RESULT_CACHE_DIR = 'cache'
+    RESULT_CACHE_MAX_MB = 2048
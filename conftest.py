@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+# Номер генератора расчетного случая заглушки
+STUB_GENERATOR = 60533014
+
+
+@pytest.fixture
+def stub_case(tmp_path) -> dict:
+    """
+    Фикстура расчетного случая заглушки: файлы режима, сценария, автоматики и КПР
+    :param tmp_path: Временный каталог
+    :return: Задание simulate_scenario
+    """
+    files = {
+        'base.rst': {'Generator': {'Num': [60533008, 60533009, STUB_GENERATOR], 'P': [300.0, 310.0, 320.0]},
+                     'com_dynamics': {'Tras': [1.0], 'Hint': [0.01], 'Hmin': [0.001], 'Hmax': [0.5],
+                                      'Hout': [0.01], 'PeriodAngle': [0]}},
+        'case.scn': {'DFWAutoActionScn': {}, 'DFWAutoLogicScn': {}},
+        'case.dfw': {},
+        'case.kpr': {'ots_val': {}},
+    }
+
+    for name, content in files.items():
+        (tmp_path / name).write_text(json.dumps(content), encoding='utf-8')
+
+    return {'rst_file': str(tmp_path / 'base.rst'),
+            'scn_file': str(tmp_path / 'case.scn'),
+            'dfw_file': str(tmp_path / 'case.dfw'),
+            'shablon_scn': str(tmp_path / 'case.scn'),
+            'kpr_file': str(tmp_path / 'case.kpr'),
+            'name': 'Исследуемый', 'data_set': f'Num={STUB_GENERATOR}',
+            'name_support': 'Опорный', 'set_support': 'Num=60533008',
+            'dynamic': {'input_width': 1.0},
+            'channel': ('Generator', 'Delta', STUB_GENERATOR)}
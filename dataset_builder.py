@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+from typing import Iterable
+
+import numpy as np
+
+import trajectory_io
+from features import FEATURE_COLUMNS
+
+# Параметры набора, которые должны совпадать при продолжении
+MANIFEST_PARAMETERS = ('input_width', 'data_in_frame', 'stride', 'validation_fraction', 'seed')
+
+
+class DatasetBuilder:
+    """
+    Класс, формирующий обучающий набор из предобработанных переходных процессов
+    в виде шардов .npz фиксированного размера с описью manifest.json
+    """
+
+    def __init__(self, output_dir: str, input_width: int, data_in_frame: int,
+                 shard_size: int = 1024, stride: int = None,
+                 validation_fraction: float = 0.1, seed: int = 0):
+        """
+        Инициализация класса. Если в каталоге есть опись, формирование продолжается.
+
+        :param output_dir: Каталог набора.
+        :param input_width: Входное окно модели, точек.
+        :param data_in_frame: Количество точек в окне (вход и прогноз).
+        :param shard_size: Количество окон в шарде.
+        :param stride: Шаг нарезки окон, точек (по умолчанию data_in_frame).
+        :param validation_fraction: Доля процессов в проверочной выборке.
+        :param seed: Зерно разбиения на выборки.
+        """
+        self.output_dir = output_dir
+        self.input_width = input_width
+        self.data_in_frame = data_in_frame
+        self.shard_size = shard_size
+        self.stride = stride or data_in_frame
+        self.validation_fraction = validation_fraction
+        self.seed = seed
+
+        self.manifest = {'input_width': input_width,
+                         'data_in_frame': data_in_frame,
+                         'stride': self.stride,
+                         'validation_fraction': validation_fraction,
+                         'seed': seed,
+                         'shards': [],
+                         'sources': [],
+                         'partial': {}}
+
+        os.makedirs(output_dir, exist_ok=True)
+        self._load_manifest()
+
+        self.done = set(self.manifest['sources'])
+
+        # Окна, еще не записанные в шарды: выборка -> (входы, прогнозы, источники)
+        self.buffers = {'train': ([], [], []), 'validation': ([], [], [])}
+
+        # Источник -> количество его окон в буферах
+        self.pending = {}
+
+    def _manifest_path(self) -> str:
+        """
+        Метод получения пути к описи набора.
+
+        :return: Путь к manifest.json.
+        """
+        return os.path.join(self.output_dir, 'manifest.json')
+
+    def _load_manifest(self) -> None:
+        """
+        Метод чтения описи для продолжения формирования набора.
+
+        :return: None
+        """
+        if not os.path.isfile(self._manifest_path()):
+            return
+
+        with open(self._manifest_path(), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+
+        for parameter in MANIFEST_PARAMETERS:
+            if manifest[parameter] != self.manifest[parameter]:
+                raise Exception(f"Параметр {parameter} набора {manifest[parameter]} "
+                                f"не совпадает с заданным {self.manifest[parameter]}")
+
+        self.manifest = manifest
+
+    def _save_manifest(self) -> None:
+        """
+        Метод атомарной записи описи набора.
+
+        :return: None
+        """
+        temporary = self._manifest_path() + '.tmp'
+
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self.manifest, file, ensure_ascii=False)
+
+        os.replace(temporary, self._manifest_path())
+
+    def split(self, source_id: str) -> str:
+        """
+        Метод детерминированного отнесения процесса к выборке.
+
+        :param source_id: Идентификатор процесса.
+        :return: 'train' или 'validation'.
+        """
+        digest = hashlib.sha256(f"{self.seed}:{source_id}".encode()).digest()
+        position = int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+        return 'validation' if position < self.validation_fraction else 'train'
+
+    def windows(self, trajectory: np.ndarray) -> tuple:
+        """
+        Метод нарезки процесса на окна.
+
+        :param trajectory: Массив (точки, 4) нормализованных delta, w, a, p.
+        :return: Входы (окна, input_width, 4) и прогнозы (окна, data_in_frame - input_width, 4).
+        """
+        starts = range(0, len(trajectory) - self.data_in_frame + 1, self.stride)
+        frames = np.stack([trajectory[start:start + self.data_in_frame] for start in starts]) \
+            if len(starts) else np.empty((0, self.data_in_frame, trajectory.shape[1]), dtype=np.float32)
+
+        return frames[:, :self.input_width], frames[:, self.input_width:]
+
+    def add(self, source_id: str, trajectory: np.ndarray) -> int:
+        """
+        Метод добавления процесса в набор.
+
+        :param source_id: Идентификатор процесса.
+        :param trajectory: Массив (точки, 4) нормализованных delta, w, a, p.
+        :return: Количество добавленных окон.
+        """
+        if source_id in self.done or source_id in self.pending:
+            return 0
+
+        inputs, targets = self.windows(np.asarray(trajectory, dtype=np.float32))
+
+        # Окна, записанные в шарды до прерывания, не повторяются
+        written = self.manifest['partial'].get(source_id, 0)
+        inputs, targets = inputs[written:], targets[written:]
+
+        if not len(inputs):
+            self._commit_sources([source_id])
+            return 0
+
+        split = self.split(source_id)
+        buffer_inputs, buffer_targets, buffer_sources = self.buffers[split]
+
+        buffer_inputs.extend(inputs)
+        buffer_targets.extend(targets)
+        buffer_sources.extend([source_id] * len(inputs))
+        self.pending[source_id] = len(inputs)
+
+        while len(buffer_inputs) >= self.shard_size:
+            self._flush(split, self.shard_size)
+
+        return len(inputs)
+
+    def build(self, sources: Iterable) -> int:
+        """
+        Метод формирования набора из файлов переходных процессов.
+        Уже включенные в набор процессы пропускаются.
+
+        :param sources: Пары (идентификатор процесса, путь к файлу .npy или .csv).
+        :return: Количество добавленных окон.
+        """
+        added = 0
+
+        for source_id, path in sources:
+            if source_id in self.done:
+                continue
+
+            added += self.add(source_id, trajectory_io.read_trajectory(path, columns=FEATURE_COLUMNS))
+
+        return added
+
+    def close(self) -> dict:
+        """
+        Метод записи неполных шардов и описи.
+
+        :return: Опись набора.
+        """
+        for split, (buffer_inputs, _, _) in self.buffers.items():
+            if buffer_inputs:
+                self._flush(split, len(buffer_inputs))
+
+        self._save_manifest()
+        return self.manifest
+
+    def _flush(self, split: str, count: int) -> None:
+        """
+        Метод записи первых count окон выборки в шард.
+
+        :param split: Выборка.
+        :param count: Количество окон.
+        :return: None
+        """
+        buffer_inputs, buffer_targets, buffer_sources = self.buffers[split]
+
+        index = sum(1 for shard in self.manifest['shards'] if shard['split'] == split)
+        name = f"{split}_{index:05d}.npz"
+        temporary = os.path.join(self.output_dir, name + '.tmp')
+
+        with open(temporary, "wb") as file:
+            np.savez(file, x=np.stack(buffer_inputs[:count]), y=np.stack(buffer_targets[:count]))
+
+        os.replace(temporary, os.path.join(self.output_dir, name))
+
+        flushed_sources = buffer_sources[:count]
+
+        del buffer_inputs[:count]
+        del buffer_targets[:count]
+        del buffer_sources[:count]
+
+        self.manifest['shards'].append({'file': name, 'split': split, 'count': count})
+
+        # Процесс считается включенным, когда все его окна записаны
+        partial = self.manifest['partial']
+        completed = []
+
+        for source_id in flushed_sources:
+            self.pending[source_id] -= 1
+            partial[source_id] = partial.get(source_id, 0) + 1
+
+            if not self.pending[source_id]:
+                del self.pending[source_id]
+                completed.append(source_id)
+
+        self._commit_sources(completed)
+
+    def _commit_sources(self, sources: list) -> None:
+        """
+        Метод отметки процессов как включенных в набор с записью описи.
+
+        :param sources: Идентификаторы процессов.
+        :return: None
+        """
+        for source_id in sources:
+            self.manifest['partial'].pop(source_id, None)
+
+        self.manifest['sources'].extend(sources)
+        self.done.update(sources)
+        self._save_manifest()
@@ -0,0 +1,90 @@
+import numpy as np
+
+# Признаки, подаваемые на вход модели
+FEATURE_COLUMNS = ['delta', 'w', 'a', 'p']
+
+# Префикс столбцов мощности генераторов в результатах расчета
+POWER_PREFIX = 'p_'
+
+# Управляющее воздействие при отсутствии мощностей в результатах: (до, после, номер точки)
+CONTROL_SIGNAL = (2700.0, 2000.0, 36)
+
+
+def build_features(values: np.ndarray, columns: list) -> np.ndarray:
+    """
+    Функция расчета признаков delta, w, a, p из каналов результата
+    :param values: Массив (точки, каналы) результата расчета
+    :param columns: Наименования каналов (delta, p_<номер>, t, ...)
+    :return: Массив признаков (точки, 4) float64
+    """
+    values = np.asarray(values, dtype=np.float64)
+    features = np.empty((len(values), len(FEATURE_COLUMNS)))
+
+    # Угол, скорость и ускорение как первая и вторая производные по точкам
+    features[:, 0] = values[:, columns.index('delta')]
+    features[:, 1] = np.gradient(features[:, 0])
+    features[:, 2] = np.gradient(features[:, 1])
+
+    power_positions = [position for position, column in enumerate(columns)
+                       if column.startswith(POWER_PREFIX)]
+
+    if power_positions:
+        # Мощность станции по результатам расчета
+        np.sum(values[:, power_positions], axis=1, out=features[:, 3])
+
+    else:
+        before, after, switch = CONTROL_SIGNAL
+        features[:switch, 3] = before
+        features[switch:, 3] = after
+
+    return features
+
+def fit_scaler(features: np.ndarray) -> np.ndarray:
+    """
+    Функция определения масштаба признаков
+    :param features: Массив признаков (точки, признаки)
+    :return: Массив (2, признаки): минимумы и максимумы
+    """
+    return np.stack([features.min(axis=0), features.max(axis=0)])
+
+def normalize(features: np.ndarray, scaler: np.ndarray) -> np.ndarray:
+    """
+    Функция мин-макс нормализации признаков на месте.
+    Постоянный признак (например, мощность без отключений) становится равным 0
+    :param features: Массив признаков (точки, признаки) float
+    :param scaler: Массив (2, признаки): минимумы и максимумы
+    :return: Тот же массив признаков
+    """
+    low, high = scaler
+    span = high - low
+
+    features -= low
+    np.divide(features, span, out=features, where=span != 0)
+    features[:, span == 0] = 0.0
+
+    return features
+
+def denormalize(predictions: np.ndarray, scalers: np.ndarray) -> np.ndarray:
+    """
+    Функция перевода нормализованного прогноза в исходные единицы
+    :param predictions: Прогноз (процессы, точки, признаки)
+    :param scalers: Масштабы (процессы, 2, признаки) или общий масштаб (2, признаки)
+    :return: Прогноз в исходных единицах
+    """
+    scalers = np.asarray(scalers, dtype=predictions.dtype)
+    low = scalers[..., 0:1, :]
+    high = scalers[..., 1:2, :]
+
+    return predictions * (high - low) + low
+
+def preprocess(values: np.ndarray, columns: list) -> tuple:
+    """
+    Функция предобработки переходного процесса: признаки и нормализация
+    :param values: Массив (точки, каналы) результата расчета
+    :param columns: Наименования каналов
+    :return: Нормализованные признаки (точки, 4) float32 и масштаб (2, 4)
+    """
+    features = build_features(values, columns)
+    scaler = fit_scaler(features)
+
+    return normalize(features, scaler).astype(np.float32), scaler
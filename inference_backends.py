@@ -0,0 +1,329 @@
+import abc
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Форматы прогноза: keras - модель .h5 в TensorFlow, onnx и tflite - экспортированные модели
+BACKENDS = ('keras', 'onnx', 'tflite')
+
+# Варианты весов экспортированных моделей ('' - float32)
+QUANTIZATIONS = ('', 'float16', 'int8')
+
+# Расширения файлов экспортированных моделей
+EXTENSIONS = {'onnx': '.onnx', 'tflite': '.tflite'}
+
+
+def artifact_path(source: str, backend: str, quantization: str = '') -> str:
+    """
+    Функция получения пути к экспортированной модели по пути к модели Keras:
+    model.h5 -> model.onnx, model.int8.onnx, model.float16.tflite, ...
+    :param source: Путь к файлу модели Keras
+    :param backend: Формат (onnx или tflite)
+    :param quantization: Вариант весов ('', 'float16' или 'int8')
+    :return: Путь к файлу экспортированной модели
+    """
+    if quantization not in QUANTIZATIONS:
+        raise Exception(f"Вариант весов {quantization} не поддерживается")
+
+    suffix = f".{quantization}" if quantization else ""
+    return os.path.splitext(source)[0] + suffix + EXTENSIONS[backend]
+
+
+class KerasEngine:
+    """
+    Класс прогноза моделью Keras через model.predict
+    """
+
+    def __init__(self, registry):
+        """
+        Инициализация класса.
+
+        :param registry: Реестр моделей прогноза.
+        """
+        self.registry = registry
+
+    def get(self, name: str, input_width: int):
+        """
+        Метод получения модели с загрузкой при первом обращении.
+
+        :param name: Имя модели из таблицы Model.
+        :param input_width: Входное окно модели.
+        :return: Модель Keras.
+        """
+        return self.registry.get(name, input_width)
+
+    def predict(self, name: str, batch: np.ndarray) -> np.ndarray:
+        """
+        Метод пакетного прогноза.
+
+        :param name: Имя модели из таблицы Model.
+        :param batch: Пакет входов модели (пакет, input_width, 4).
+        :return: Выход модели.
+        """
+        model = self.get(name, batch.shape[1])
+        return model.predict(batch, batch_size=len(batch), verbose=0)
+
+    def stats(self) -> dict:
+        """
+        Метод получения состояния.
+
+        :return: Словарь {'models': загруженные модели, 'bytes': объем весов}.
+        """
+        return self.registry.stats()
+
+
+class ExportedEngine(abc.ABC):
+    """
+    Базовый класс прогноза экспортированной моделью (ONNX или TFLite) без TensorFlow
+    """
+
+    backend = None
+
+    def __init__(self, models_dir: str, default_artifact: str, artifacts: dict = None,
+                 quantization: str = '', threads: int = 0, max_models: int = 4):
+        """
+        Инициализация класса.
+
+        :param models_dir: Каталог с файлами моделей.
+        :param default_artifact: Файл модели Keras для имен без собственного файла.
+        :param artifacts: Явное соответствие {имя модели: путь к файлу модели Keras}.
+        :param quantization: Вариант весов ('', 'float16' или 'int8').
+        :param threads: Количество потоков прогноза одной модели (0 - по умолчанию).
+        :param max_models: Наибольшее количество загруженных моделей.
+        """
+        self.models_dir = models_dir
+        self.default_artifact = default_artifact
+        self.artifacts = artifacts or {}
+        self.quantization = quantization
+        self.threads = threads
+        self.max_models = max_models
+
+        # Имя модели -> (сеанс прогноза, объем файла)
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def resolve_artifact(self, name: str) -> str:
+        """
+        Метод определения файла экспортированной модели по имени.
+
+        :param name: Имя модели из таблицы Model.
+        :return: Путь к файлу модели.
+        """
+        if name in self.artifacts:
+            return artifact_path(self.artifacts[name], self.backend, self.quantization)
+
+        path = artifact_path(os.path.join(self.models_dir, f"{name}.h5"), self.backend, self.quantization)
+
+        if os.path.isfile(path):
+            return path
+
+        return artifact_path(self.default_artifact, self.backend, self.quantization)
+
+    @abc.abstractmethod
+    def _load(self, path: str):
+        """
+        Метод создания сеанса прогноза.
+
+        :param path: Путь к файлу модели.
+        :return: Сеанс прогноза.
+        """
+
+    @abc.abstractmethod
+    def _run(self, session, batch: np.ndarray) -> np.ndarray:
+        """
+        Метод прогноза в сеансе.
+
+        :param session: Сеанс прогноза.
+        :param batch: Пакет входов модели float32.
+        :return: Выход модели.
+        """
+
+    def get(self, name: str, input_width: int):
+        """
+        Метод получения сеанса прогноза с загрузкой и прогревом при первом обращении.
+
+        :param name: Имя модели из таблицы Model.
+        :param input_width: Входное окно модели.
+        :return: Сеанс прогноза.
+        """
+        with self.lock:
+            if name in self.sessions:
+                self.sessions.move_to_end(name)
+                return self.sessions[name][0]
+
+            path = self.resolve_artifact(name)
+
+            if not os.path.isfile(path):
+                raise Exception(f"Экспортированная модель {path} не найдена")
+
+            session = self._load(path)
+            self._run(session, np.zeros((1, input_width, 4), dtype=np.float32))
+
+            self.sessions[name] = (session, os.path.getsize(path))
+
+            while len(self.sessions) > self.max_models:
+                self.sessions.popitem(last=False)
+
+            return session
+
+    def predict(self, name: str, batch: np.ndarray) -> np.ndarray:
+        """
+        Метод пакетного прогноза.
+
+        :param name: Имя модели из таблицы Model.
+        :param batch: Пакет входов модели (пакет, input_width, 4).
+        :return: Выход модели.
+        """
+        session = self.get(name, batch.shape[1])
+        return self._run(session, np.ascontiguousarray(batch, dtype=np.float32))
+
+    def stats(self) -> dict:
+        """
+        Метод получения состояния.
+
+        :return: Словарь {'models': загруженные модели, 'bytes': объем файлов моделей}.
+        """
+        with self.lock:
+            return {'models': list(self.sessions),
+                    'bytes': sum(size for _, size in self.sessions.values()),
+                    'backend': self.backend,
+                    'quantization': self.quantization}
+
+
+class OnnxEngine(ExportedEngine):
+    """
+    Класс прогноза моделью ONNX в ONNX Runtime на CPU
+    """
+
+    backend = 'onnx'
+
+    def _load(self, path: str):
+        """
+        Метод создания сеанса ONNX Runtime с полной оптимизацией графа.
+
+        :param path: Путь к файлу модели ONNX.
+        :return: Сеанс onnxruntime.InferenceSession.
+        """
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+            options.inter_op_num_threads = 1
+
+        return onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+    def _run(self, session, batch: np.ndarray) -> np.ndarray:
+        """
+        Метод прогноза в сеансе ONNX Runtime.
+
+        :param session: Сеанс onnxruntime.InferenceSession.
+        :param batch: Пакет входов модели float32.
+        :return: Первый выход модели.
+        """
+        # Сеанс ONNX Runtime допускает одновременные вызовы run
+        return session.run(None, {session.get_inputs()[0].name: batch})[0]
+
+
+class TfliteEngine(ExportedEngine):
+    """
+    Класс прогноза моделью TFLite (tflite_runtime, иначе tf.lite)
+    """
+
+    backend = 'tflite'
+
+    def _load(self, path: str):
+        """
+        Метод создания интерпретатора TFLite с выделенными тензорами.
+
+        :param path: Путь к файлу модели TFLite.
+        :return: Пара (интерпретатор, блокировка интерпретатора).
+        """
+        try:
+            from tflite_runtime.interpreter import Interpreter
+
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        interpreter = Interpreter(model_path=path, num_threads=self.threads or None)
+        interpreter.allocate_tensors()
+
+        # Интерпретатор не допускает одновременных вызовов
+        return interpreter, threading.Lock()
+
+    def _run(self, session, batch: np.ndarray) -> np.ndarray:
+        """
+        Метод прогноза интерпретатором TFLite с изменением формы входа под пакет.
+
+        :param session: Пара (интерпретатор, блокировка интерпретатора).
+        :param batch: Пакет входов модели float32.
+        :return: Копия выхода модели.
+        """
+        interpreter, lock = session
+
+        with lock:
+            input_details = interpreter.get_input_details()[0]
+            output_index = interpreter.get_output_details()[0]['index']
+
+            # Модель экспортирована с пакетом из одного процесса: пакет прогнозируется построчно
+            if input_details['shape_signature'][0] == 1:
+                outputs = []
+
+                for row in batch:
+                    interpreter.set_tensor(input_details['index'], row[np.newaxis])
+                    interpreter.invoke()
+                    outputs.append(interpreter.get_tensor(output_index)[0])
+
+                return np.stack(outputs)
+
+            if tuple(input_details['shape']) != batch.shape:
+                interpreter.resize_tensor_input(input_details['index'], batch.shape)
+                interpreter.allocate_tensors()
+
+            interpreter.set_tensor(input_details['index'], batch)
+            interpreter.invoke()
+
+            return interpreter.get_tensor(output_index).copy()
+
+
+def create_engine(config) -> any:
+    """
+    Функция создания движка прогноза по настройкам приложения.
+    TensorFlow импортируется только для формата keras
+    :param config: Настройки приложения (INFERENCE_BACKEND, MODEL_*, INFERENCE_*)
+    :return: Движок прогноза с методами get, predict и stats
+    """
+    backend = config['INFERENCE_BACKEND']
+
+    if backend not in BACKENDS:
+        raise Exception(f"Формат прогноза {backend} не поддерживается, доступны: {', '.join(BACKENDS)}")
+
+    if backend == 'keras':
+        from model_registry import ModelRegistry
+
+        registry = ModelRegistry(config['MODEL_DIR'], config['MODEL_DEFAULT_ARTIFACT'],
+                                 config['MODEL_ARTIFACTS'], config['MODEL_CACHE_SIZE'],
+                                 config['MODEL_CACHE_MAX_MB'] * 1024 * 1024)
+
+        if not config['INFERENCE_COMPILED']:
+            return KerasEngine(registry)
+
+        from inference_engine import InferenceEngine
+        return InferenceEngine(registry, config['INFERENCE_XLA'])
+
+    engine_class = OnnxEngine if backend == 'onnx' else TfliteEngine
+    default_path = artifact_path(config['MODEL_DEFAULT_ARTIFACT'], backend, config['INFERENCE_QUANTIZATION'])
+
+    # Без экспортированной общей модели сервис не запускается, а не падает на первом запросе
+    if not os.path.isfile(default_path):
+        raise Exception(f"Экспортированная модель {default_path} не найдена, "
+                        f"выполните model_export.py --backend {backend}")
+
+    return engine_class(config['MODEL_DIR'], config['MODEL_DEFAULT_ARTIFACT'], config['MODEL_ARTIFACTS'],
+                        config['INFERENCE_QUANTIZATION'], config['INFERENCE_THREADS'],
+                        config['MODEL_CACHE_SIZE'])
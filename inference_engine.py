@@ -0,0 +1,108 @@
+import threading
+
+import numpy as np
+import tensorflow as tf
+
+from model_registry import ModelRegistry
+
+
+class InferenceEngine:
+    """
+    Класс, выполняющий прогноз через скомпилированную функцию tf.function
+    с фиксированной сигнатурой входа (пакет, input_width, 4)
+    """
+
+    def __init__(self, registry: ModelRegistry, jit_compile: bool = False):
+        """
+        Инициализация класса.
+
+        :param registry: Реестр моделей прогноза.
+        :param jit_compile: Компиляция графа XLA.
+        """
+        self.registry = registry
+        self.jit_compile = jit_compile
+
+        # (имя модели, входное окно) -> (модель, скомпилированная функция)
+        self.functions = {}
+        self.lock = threading.Lock()
+
+    def _compile(self, model: tf.keras.Model, input_width: int):
+        """
+        Метод трассировки прямого прохода модели с прогревом.
+
+        :param model: Модель Keras.
+        :param input_width: Входное окно модели.
+        :return: Скомпилированная функция прогноза.
+        """
+        @tf.function(input_signature=[tf.TensorSpec((None, input_width, 4), tf.float32)],
+                     jit_compile=self.jit_compile)
+        def serve(batch):
+            return model(batch, training=False)
+
+        # Прогрев: трассировка и компиляция до первого реального запроса
+        serve(tf.zeros((1, input_width, 4), dtype=tf.float32))
+
+        return serve
+
+    def get(self, name: str, input_width: int):
+        """
+        Метод получения скомпилированной функции модели.
+        Функция пересобирается, если модель была выгружена из реестра и загружена заново.
+
+        :param name: Имя модели из таблицы Model.
+        :param input_width: Входное окно модели.
+        :return: Скомпилированная функция прогноза.
+        """
+        model = self.registry.get(name, input_width)
+        key = (name, input_width)
+
+        with self.lock:
+            cached = self.functions.get(key)
+
+            if cached is not None and cached[0] is model:
+                return cached[1]
+
+            # Функции выгруженных из реестра моделей удерживают их веса
+            loaded = set(self.registry.stats()['models'])
+            for stale in [stale for stale in self.functions if stale[0] not in loaded]:
+                del self.functions[stale]
+
+            serve = self._compile(model, input_width)
+            self.functions[key] = (model, serve)
+
+            return serve
+
+    def predict(self, name: str, batch: np.ndarray) -> np.ndarray:
+        """
+        Метод пакетного прогноза.
+
+        :param name: Имя модели из таблицы Model.
+        :param batch: Пакет входов модели (пакет, input_width, 4).
+        :return: Выход модели.
+        """
+        serve = self.get(name, batch.shape[1])
+        count = len(batch)
+        batch = np.asarray(batch, dtype=np.float32)
+
+        # XLA компилирует граф под каждый размер пакета: размер дополняется
+        # до степени двойки, чтобы число компиляций было ограничено
+        if self.jit_compile:
+            padded = 1 << (count - 1).bit_length()
+
+            if padded != count:
+                batch = np.concatenate([batch, np.zeros((padded - count,) + batch.shape[1:],
+                                                        dtype=np.float32)])
+
+        return serve(tf.constant(batch)).numpy()[:count]
+
+    def stats(self) -> dict:
+        """
+        Метод получения состояния движка.
+
+        :return: Словарь состояния реестра с ключами 'functions' (скомпилированные модель и окно)
+                 и 'jit_compile' (признак XLA).
+        """
+        with self.lock:
+            return dict(self.registry.stats(),
+                        functions=[list(key) for key in self.functions],
+                        jit_compile=self.jit_compile)
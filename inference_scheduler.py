@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+import numpy as np
+
+import metrics
+
+
+class InferenceScheduler:
+    """
+    Класс, объединяющий одновременные запросы прогноза в пакеты
+    """
+
+    def __init__(self, predict: Callable, max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, max_queue: int = 1024):
+        """
+        Инициализация класса.
+
+        :param predict: Функция прогноза predict(ключ группы, пакет) -> выход модели.
+        :param max_batch_size: Наибольший размер пакета.
+        :param max_wait_ms: Наибольшее время накопления пакета, мс.
+        :param max_queue: Наибольшая длина очереди запросов.
+        """
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue(maxsize=max_queue)
+
+        self.batch_size_histogram = metrics.registry.histogram(
+            'inference_batch_size', buckets=[1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.wait_time_histogram = metrics.registry.histogram(
+            'inference_wait_seconds', buckets=[0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25])
+
+        self.worker = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+        self.worker.start()
+
+    def submit(self, key: tuple, item: np.ndarray) -> Future:
+        """
+        Метод постановки элемента в очередь прогноза.
+
+        :param key: Ключ группы (модель и размерность входа).
+        :param item: Вход модели без оси пакета.
+        :return: Объект Future с выходом модели для элемента.
+        :raises queue.Full: Очередь переполнена.
+        """
+        future = Future()
+        self.queue.put_nowait((key, item, future, time.perf_counter()))
+        return future
+
+    def stats(self) -> dict:
+        """
+        Метод получения статистики планировщика.
+
+        :return: Словарь с гистограммами размеров пакетов и ожидания.
+        """
+        return {'queue_depth': self.queue.qsize(),
+                'batch_size': self.batch_size_histogram.snapshot(),
+                'wait_time_seconds': self.wait_time_histogram.snapshot()}
+
+    def _collect(self) -> list:
+        """
+        Метод накопления запросов до заполнения пакета или истечения окна.
+
+        :return: Список запросов.
+        """
+        requests = [self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(requests) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+
+            if timeout <= 0:
+                break
+
+            try:
+                requests.append(self.queue.get(timeout=timeout))
+
+            except queue.Empty:
+                break
+
+        return requests
+
+    def _run(self) -> None:
+        """
+        Метод рабочего потока: пакетный прогноз по группам.
+
+        :return: None
+        """
+        while True:
+            requests = self._collect()
+
+            groups = {}
+            for request in requests:
+                groups.setdefault(request[0], []).append(request)
+
+            for key, group in groups.items():
+                started = time.perf_counter()
+
+                for _, _, _, submitted in group:
+                    self.wait_time_histogram.observe(started - submitted)
+
+                self.batch_size_histogram.observe(len(group))
+
+                try:
+                    outputs = self.predict(key, np.stack([item for _, item, _, _ in group]))
+
+                except Exception as ex:
+                    for _, _, future, _ in group:
+                        future.set_exception(ex)
+                    continue
+
+                for position, (_, _, future, _) in enumerate(group):
+                    future.set_result(outputs[position:position + 1])
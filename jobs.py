@@ -0,0 +1,142 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class JobManager:
+    """
+    Класс, управляющий фоновыми заданиями расчета
+    """
+
+    def __init__(self, max_workers: int = 1, history_limit: int = 1000):
+        """
+        Инициализация класса.
+
+        :param max_workers: Количество параллельно выполняемых заданий.
+        :param history_limit: Количество хранимых завершенных заданий.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="transient-job")
+        self.history_limit = history_limit
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, func: Callable, stages: list, *args, **kwargs) -> str:
+        """
+        Метод постановки задания в очередь.
+        Функция задания получает аргумент report для отметки начала этапа.
+
+        :param func: Функция задания.
+        :param stages: Список этапов задания.
+        :return: Идентификатор задания.
+        """
+        job_id = uuid.uuid4().hex
+
+        with self.lock:
+            self.jobs[job_id] = {
+                'id': job_id,
+                'status': 'queued',
+                'stages': {stage: 'pending' for stage in stages},
+                'result': None,
+                'error': None,
+                'created': time.time(),
+                'started': None,
+                'finished': None,
+            }
+            self._trim_history()
+
+        self.executor.submit(self._run, job_id, func, *args, **kwargs)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """
+        Метод получения состояния задания.
+
+        :param job_id: Идентификатор задания.
+        :return: Копия описания задания или None.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+
+            if job is None:
+                return None
+
+            return dict(job, stages=dict(job['stages']))
+
+    def _run(self, job_id: str, func: Callable, *args, **kwargs) -> None:
+        """
+        Метод выполнения задания в рабочем потоке.
+
+        :param job_id: Идентификатор задания.
+        :param func: Функция задания.
+        :return: None
+        """
+        self._update(job_id, status='running', started=time.time())
+
+        try:
+            result = func(*args, report=lambda stage: self._report(job_id, stage), **kwargs)
+
+        except Exception as ex:
+            with self.lock:
+                job = self.jobs[job_id]
+                for stage, state in job['stages'].items():
+                    if state == 'running':
+                        job['stages'][stage] = 'failed'
+
+            self._update(job_id, status='failed', error=str(ex), finished=time.time())
+            return
+
+        with self.lock:
+            job = self.jobs[job_id]
+            for stage in job['stages']:
+                job['stages'][stage] = 'done'
+
+        self._update(job_id, status='done', result=result, finished=time.time())
+
+    def _report(self, job_id: str, stage: str) -> None:
+        """
+        Метод отметки начала этапа задания.
+        Все предыдущие этапы считаются завершенными.
+
+        :param job_id: Идентификатор задания.
+        :param stage: Наименование этапа.
+        :return: None
+        """
+        with self.lock:
+            stages = self.jobs[job_id]['stages']
+
+            for name in stages:
+                if name == stage:
+                    stages[name] = 'running'
+                    break
+
+                stages[name] = 'done'
+
+    def _update(self, job_id: str, **fields) -> None:
+        """
+        Метод обновления полей задания.
+
+        :param job_id: Идентификатор задания.
+        :return: None
+        """
+        with self.lock:
+            self.jobs[job_id].update(fields)
+
+    def _trim_history(self) -> None:
+        """
+        Метод удаления самых старых завершенных заданий сверх лимита.
+
+        :return: None
+        """
+        finished = [job for job in self.jobs.values()
+                    if job['status'] in ('done', 'failed')]
+
+        excess = len(finished) - self.history_limit
+
+        if excess > 0:
+            finished.sort(key=lambda job: job['finished'])
+
+            for job in finished[:excess]:
+                del self.jobs[job['id']]
@@ -0,0 +1,269 @@
+import bisect
+import contextvars
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import numpy as np
+
+# Границы корзин длительностей этапов, с
+STAGE_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300]
+
+# Типы значений, которые возвращаются из COM без обертки
+PLAIN_TYPES = (int, float, str, bool, bytes, tuple, list, dict, type(None))
+
+
+class Histogram:
+    """
+    Класс, описывающий гистограмму с накопленными корзинами
+    """
+
+    def __init__(self, buckets: list):
+        """
+        Инициализация класса.
+
+        :param buckets: Верхние границы корзин по возрастанию.
+        """
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """
+        Метод учета наблюдения.
+
+        :param value: Наблюдаемое значение.
+        :return: None
+        """
+        with self.lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        """
+        Метод получения состояния гистограммы.
+
+        :return: Словарь {'buckets': {граница: накопленное количество}, 'sum', 'count'}.
+        """
+        with self.lock:
+            cumulative = np.cumsum(self.counts).tolist()
+            bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+
+            return {'buckets': dict(zip(bounds, cumulative)),
+                    'sum': self.total,
+                    'count': self.count}
+
+
+class MetricsRegistry:
+    """
+    Класс, описывающий реестр метрик сервиса в формате Prometheus
+    """
+
+    def __init__(self):
+        """
+        Инициализация класса.
+        """
+        self.counters = {}
+        self.histograms = {}
+        self.collectors = []
+        self.lock = threading.Lock()
+
+    def increment(self, name: str, labels: dict = None, value: float = 1) -> None:
+        """
+        Метод увеличения счетчика.
+
+        :param name: Наименование метрики.
+        :param labels: Метки.
+        :param value: Приращение.
+        :return: None
+        """
+        key = (name, tuple(sorted((labels or {}).items())))
+
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def histogram(self, name: str, labels: dict = None, buckets: list = None) -> Histogram:
+        """
+        Метод получения гистограммы с созданием при первом обращении.
+
+        :param name: Наименование метрики.
+        :param labels: Метки.
+        :param buckets: Границы корзин.
+        :return: Гистограмма.
+        """
+        key = (name, tuple(sorted((labels or {}).items())))
+
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(buckets or STAGE_BUCKETS)
+
+            return self.histograms[key]
+
+    def register_collector(self, collector: Callable) -> None:
+        """
+        Метод регистрации источника мгновенных значений.
+
+        :param collector: Функция без аргументов, возвращающая список (наименование, метки, значение).
+        :return: None
+        """
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Метод формирования текста метрик в формате Prometheus.
+
+        :return: Текст метрик.
+        """
+        lines = []
+        typed = set()
+
+        def declare(name: str, metric_type: str) -> None:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {metric_type}")
+
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+
+        for (name, labels), value in counters:
+            declare(name, 'counter')
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+            declare(name, 'histogram')
+            snapshot = histogram.snapshot()
+
+            for bound, count in snapshot['buckets'].items():
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+
+            lines.append(f"{name}_sum{_format_labels(labels)} {snapshot['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+
+        for collector in self.collectors:
+            for name, labels, value in collector():
+                declare(name, 'gauge')
+                lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: tuple) -> str:
+    """
+    Функция форматирования меток Prometheus
+    :param labels: Пары (метка, значение)
+    :return: Строка вида {a="1",b="2"}
+    """
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+# Общий реестр метрик процесса
+registry = MetricsRegistry()
+
+# Длительности этапов текущего запроса (None - разбивка не запрошена)
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def start_request_timings(enabled: bool = True) -> contextvars.Token:
+    """
+    Функция начала разбивки длительностей этапов для текущего запроса.
+    Значение задается на каждый запрос: разбивка предыдущего запроса потока не наследуется
+    :param enabled: Включить разбивку (False - этапы запроса не собираются)
+    :return: Метка для восстановления прежнего значения в finish_request_timings
+    """
+    return _request_timings.set({} if enabled else None)
+
+def finish_request_timings(token: contextvars.Token) -> None:
+    """
+    Функция завершения разбивки длительностей этапов запроса
+    :param token: Метка из start_request_timings
+    :return: None
+    """
+    _request_timings.reset(token)
+
+def get_request_timings() -> Optional[dict]:
+    """
+    Функция получения длительностей этапов текущего запроса
+    :return: Словарь {этап: время, с} или None
+    """
+    return _request_timings.get()
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    Контекстный менеджер замера длительности этапа
+    :param stage: Наименование этапа
+    """
+    started = time.perf_counter()
+
+    try:
+        yield
+
+    finally:
+        elapsed = time.perf_counter() - started
+        registry.histogram('stage_duration_seconds', {'stage': stage}).observe(elapsed)
+
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+class CountingProxy:
+    """
+    Класс-обертка объекта COM, считающая обращения к нему
+    """
+
+    def __init__(self, target: any, counter: str = 'com_calls_total'):
+        """
+        Инициализация класса.
+
+        :param target: Объект COM.
+        :param counter: Наименование счетчика.
+        """
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_counter', counter)
+
+    def _wrap(self, value: any) -> any:
+        """
+        Метод обертки возвращаемого объекта.
+
+        :param value: Значение из COM.
+        :return: Значение или обертка объекта.
+        """
+        if isinstance(value, PLAIN_TYPES):
+            return value
+
+        return CountingProxy(value, self._counter)
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+
+        if inspect.ismethod(value) or inspect.isfunction(value) or inspect.isbuiltin(value):
+            def call(*args, **kwargs):
+                registry.increment(self._counter, {'method': name})
+                return self._wrap(value(*args, **kwargs))
+
+            return call
+
+        # Чтение свойства - отдельное обращение к COM
+        registry.increment(self._counter, {'method': name})
+        return self._wrap(value)
+
+    def __setattr__(self, name, value):
+        registry.increment(self._counter, {'method': name})
+        setattr(self._target, name, value)
+
+    def __call__(self, *args, **kwargs):
+        registry.increment(self._counter, {'method': '__call__'})
+        return self._wrap(self._target(*args, **kwargs))
+
+    def __getitem__(self, key):
+        registry.increment(self._counter, {'method': '__getitem__'})
+        return self._wrap(self._target[key])
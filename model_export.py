@@ -0,0 +1,107 @@
+import argparse
+import os
+
+from inference_backends import BACKENDS, QUANTIZATIONS, artifact_path
+
+
+def export_onnx(source: str, input_width: int, quantization: str = '') -> str:
+    """
+    Функция экспорта модели Keras в ONNX
+    :param source: Путь к файлу модели Keras
+    :param input_width: Входное окно модели
+    :param quantization: Вариант весов ('', 'float16' или 'int8')
+    :return: Путь к файлу модели ONNX
+    """
+    import onnx
+    import tensorflow as tf
+    import tf2onnx
+
+    model = tf.keras.models.load_model(source)
+    float_path = artifact_path(source, 'onnx')
+
+    signature = [tf.TensorSpec((None, input_width, 4), tf.float32, name='input')]
+
+    # from_keras не поддерживает модели Keras 3: граф строится из tf.function прогноза
+    forward = tf.function(lambda batch: model(batch, training=False), input_signature=signature)
+    tf2onnx.convert.from_function(forward, input_signature=signature, opset=13, output_path=float_path)
+
+    path = artifact_path(source, 'onnx', quantization)
+
+    if quantization == 'float16':
+        from onnxconverter_common import float16
+
+        # Вход и выход остаются float32: сервису не требуется приведение типов
+        onnx.save(float16.convert_float_to_float16(onnx.load(float_path), keep_io_types=True), path)
+
+    elif quantization == 'int8':
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        # Динамическое квантование: веса int8, активации квантуются при прогнозе
+        quantize_dynamic(float_path, path, weight_type=QuantType.QInt8)
+
+    return path
+
+def export_tflite(source: str, input_width: int, quantization: str = '') -> str:
+    """
+    Функция экспорта модели Keras в TFLite
+    :param source: Путь к файлу модели Keras
+    :param input_width: Входное окно модели
+    :param quantization: Вариант весов ('', 'float16' или 'int8')
+    :return: Путь к файлу модели TFLite
+    """
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(source)
+
+    # Статическая форма входа (один процесс, фиксированное окно) позволяет заменить LSTM
+    # встроенной операцией TFLite: иначе нужны операции TensorFlow (Flex), которых нет в интерпретаторе
+    fixed = tf.keras.Sequential([tf.keras.Input((input_width, 4), batch_size=1)] + model.layers)
+    converter = tf.lite.TFLiteConverter.from_keras_model(fixed)
+
+    if quantization:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if quantization == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+
+    content = converter.convert()
+    path = artifact_path(source, 'tflite', quantization)
+
+    with open(path, "wb") as file:
+        file.write(content)
+
+    return path
+
+def export_model(source: str, backend: str, input_width: int, quantization: str = '') -> str:
+    """
+    Функция экспорта модели Keras рядом с исходным файлом
+    :param source: Путь к файлу модели Keras
+    :param backend: Формат (onnx или tflite)
+    :param input_width: Входное окно модели
+    :param quantization: Вариант весов ('', 'float16' или 'int8')
+    :return: Путь к файлу экспортированной модели
+    """
+    if not os.path.isfile(source):
+        raise Exception(f"Модель {source} не найдена")
+
+    if backend == 'onnx':
+        return export_onnx(source, input_width, quantization)
+
+    if backend == 'tflite':
+        return export_tflite(source, input_width, quantization)
+
+    raise Exception(f"Формат экспорта {backend} не поддерживается")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Экспорт модели Keras в ONNX или TFLite")
+    parser.add_argument('--model', default='model.h5', help="Путь к файлу модели Keras")
+    parser.add_argument('--input-width', type=int, required=True, help="Входное окно модели")
+    parser.add_argument('--backend', choices=[backend for backend in BACKENDS if backend != 'keras'],
+                        nargs='+', default=['onnx'], help="Форматы экспорта")
+    parser.add_argument('--quantization', choices=QUANTIZATIONS, nargs='+', default=[''],
+                        help="Варианты весов ('' - float32)")
+    args = parser.parse_args()
+
+    for backend in args.backend:
+        for quantization in args.quantization:
+            print(export_model(args.model, backend, args.input_width, quantization))
@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelMetadataCache:
+    """
+    Класс, описывающий кэш параметров моделей из таблицы Model
+    """
+
+    def __init__(self, loader: Callable[[], list], ttl: float = 60.0):
+        """
+        Инициализация класса.
+
+        :param loader: Функция чтения таблицы, возвращающая список словарей с ключом 'name'.
+        :param ttl: Время актуальности кэша, с.
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.entries = {}
+        self.loaded_at = None
+        self.lock = threading.Lock()
+
+        # Перечитывание таблицы выполняет один поток, остальные ждут его результата
+        self.refresh_lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """
+        Метод перечитывания таблицы.
+
+        :return: Количество моделей в кэше.
+        """
+        rows = self.loader()
+
+        with self.lock:
+            self.entries = {row['name']: row for row in rows}
+            self.loaded_at = time.monotonic()
+
+            return len(self.entries)
+
+    def invalidate(self) -> None:
+        """
+        Метод признания кэша устаревшим: таблица перечитывается при следующем обращении.
+
+        :return: None
+        """
+        with self.lock:
+            self.loaded_at = None
+
+    def _is_stale(self) -> bool:
+        """
+        Метод проверки актуальности кэша (вызывается под self.lock).
+
+        :return: True, если таблицу нужно перечитать.
+        """
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > self.ttl
+
+    def get(self, name: str) -> Optional[dict]:
+        """
+        Метод получения параметров модели.
+        При недоступности БД используются ранее прочитанные значения.
+
+        :param name: Имя модели.
+        :return: Словарь параметров модели или None.
+        """
+        with self.lock:
+            stale = self._is_stale()
+
+        if stale:
+            with self.refresh_lock:
+                # Пока поток ждал, таблицу мог перечитать другой поток
+                with self.lock:
+                    stale = self._is_stale()
+                    has_entries = bool(self.entries)
+
+                if stale:
+                    try:
+                        self.refresh()
+
+                    except Exception as ex:
+                        if not has_entries:
+                            raise Exception(str(ex))
+
+                        logger.warning("Ошибка обновления параметров моделей: %s", ex)
+
+                        # Повторная попытка не раньше чем через ttl
+                        with self.lock:
+                            self.loaded_at = time.monotonic()
+
+        with self.lock:
+            return self.entries.get(name)
@@ -0,0 +1,99 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import tensorflow as tf
+
+
+class ModelRegistry:
+    """
+    Класс, описывающий реестр моделей прогноза с LRU-кэшем загруженных моделей
+    """
+
+    def __init__(self, models_dir: str, default_artifact: str, artifacts: dict = None,
+                 max_models: int = 4, max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Инициализация класса.
+
+        :param models_dir: Каталог с файлами моделей вида <name>.h5.
+        :param default_artifact: Файл модели для имен без собственного файла.
+        :param artifacts: Явное соответствие {имя модели: путь к файлу}.
+        :param max_models: Наибольшее количество загруженных моделей.
+        :param max_bytes: Наибольший суммарный объем весов загруженных моделей, байт.
+        """
+        self.models_dir = models_dir
+        self.default_artifact = default_artifact
+        self.artifacts = artifacts or {}
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+
+        # Имя модели -> (модель, объем весов)
+        self.models = OrderedDict()
+        self.lock = threading.Lock()
+
+    def resolve_artifact(self, name: str) -> str:
+        """
+        Метод определения файла модели по имени.
+
+        :param name: Имя модели из таблицы Model.
+        :return: Путь к файлу модели.
+        """
+        if name in self.artifacts:
+            return self.artifacts[name]
+
+        path = os.path.join(self.models_dir, f"{name}.h5")
+
+        if os.path.isfile(path):
+            return path
+
+        return self.default_artifact
+
+    def get(self, name: str, input_width: int) -> tf.keras.Model:
+        """
+        Метод получения модели с загрузкой и прогревом при первом обращении.
+
+        :param name: Имя модели из таблицы Model.
+        :param input_width: Входное окно модели.
+        :return: Модель Keras.
+        """
+        with self.lock:
+            if name in self.models:
+                self.models.move_to_end(name)
+                return self.models[name][0]
+
+            model = tf.keras.models.load_model(self.resolve_artifact(name))
+
+            # Прогрев: построение графа до первого реального запроса
+            model.predict(np.zeros((1, input_width, 4), dtype=np.float32), verbose=0)
+
+            size = sum(weight.nbytes for weight in model.get_weights())
+            self.models[name] = (model, size)
+            self._evict()
+
+            return model
+
+    def stats(self) -> dict:
+        """
+        Метод получения состояния реестра.
+
+        :return: Словарь {'models': имена в порядке от давно использованных, 'bytes': объем весов}.
+        """
+        with self.lock:
+            return {'models': list(self.models),
+                    'bytes': sum(size for _, size in self.models.values())}
+
+    def _evict(self) -> None:
+        """
+        Метод выгрузки давно использованных моделей сверх лимитов.
+        Последняя загруженная модель не выгружается.
+
+        :return: None
+        """
+        while len(self.models) > 1:
+            total = sum(size for _, size in self.models.values())
+
+            if len(self.models) <= self.max_models and total <= self.max_bytes:
+                break
+
+            self.models.popitem(last=False)
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+
+import trajectory_io
+
+
+class ResultCache:
+    """
+    Класс, описывающий дисковый кэш результатов расчета динамики,
+    адресуемый хешем содержимого входных файлов и параметров расчета
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        """
+        Инициализация класса.
+
+        :param cache_dir: Каталог кэша.
+        :param max_bytes: Наибольший объем кэша, байт.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        # Хеши файлов: (путь, время изменения, размер) -> хеш содержимого
+        self.file_digests = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def file_digest(self, path: str) -> str:
+        """
+        Метод вычисления хеша содержимого файла.
+        Хеш пересчитывается только после изменения файла.
+
+        :param path: Путь к файлу.
+        :return: Хеш SHA-256.
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+
+        digest = self.file_digests.get(key)
+
+        if digest is None:
+            sha = hashlib.sha256()
+
+            with open(path, "rb") as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                    sha.update(chunk)
+
+            digest = sha.hexdigest()
+            self.file_digests[key] = digest
+
+        return digest
+
+    def key(self, files: list, parameters: dict) -> str:
+        """
+        Метод вычисления ключа результата.
+
+        :param files: Пути к входным файлам расчета.
+        :param parameters: Параметры расчета, сериализуемые в JSON.
+        :return: Ключ результата.
+        """
+        sha = hashlib.sha256()
+
+        for path in files:
+            sha.update(self.file_digest(path).encode())
+
+        sha.update(json.dumps(parameters, sort_keys=True, ensure_ascii=False).encode())
+        return sha.hexdigest()
+
+    def path(self, key: str) -> str:
+        """
+        Метод получения пути к результату в кэше.
+
+        :param key: Ключ результата.
+        :return: Путь к файлу .npy.
+        """
+        return os.path.join(self.cache_dir, f"{key}{trajectory_io.BINARY_EXTENSION}")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Метод поиска результата в кэше.
+
+        :param key: Ключ результата.
+        :return: Путь к файлу .npy или None.
+        """
+        path = self.path(key)
+
+        with self.lock:
+            if not os.path.isfile(path):
+                self.misses += 1
+                return None
+
+            # Время изменения служит меткой последнего использования
+            os.utime(path)
+            self.hits += 1
+            return path
+
+    def get_into(self, key: str, destination: str) -> bool:
+        """
+        Метод копирования результата из кэша.
+        Копирование выполняется под блокировкой: вытеснение не удалит файл во время копирования.
+
+        :param key: Ключ результата.
+        :param destination: Путь к файлу .npy, куда копируется результат.
+        :return: True, если результат найден и скопирован.
+        """
+        path = self.path(key)
+
+        with self.lock:
+            try:
+                trajectory_io.copy_trajectory(path, destination)
+
+            except FileNotFoundError:
+                self.misses += 1
+                return False
+
+            # Время изменения служит меткой последнего использования
+            os.utime(path)
+            self.hits += 1
+            return True
+
+    def put(self, key: str, source_path: str) -> str:
+        """
+        Метод сохранения результата в кэш.
+
+        :param key: Ключ результата.
+        :param source_path: Путь к двоичному переходному процессу.
+        :return: Путь к файлу в кэше.
+        """
+        with self.lock:
+            path = trajectory_io.copy_trajectory(source_path, self.path(key))
+            self._evict()
+            return path
+
+    def stats(self) -> dict:
+        """
+        Метод получения статистики кэша.
+
+        :return: Словарь {'hits', 'misses', 'entries', 'bytes'}.
+        """
+        with self.lock:
+            entries = self._entries()
+
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'entries': len(entries),
+                    'bytes': sum(size for _, _, size in entries)}
+
+    def _entries(self) -> list:
+        """
+        Метод получения записей кэша.
+
+        :return: Список (время использования, путь, размер с описанием).
+        """
+        entries = []
+
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(trajectory_io.BINARY_EXTENSION):
+                continue
+
+            path = os.path.join(self.cache_dir, name)
+            stat = os.stat(path)
+            size = stat.st_size
+
+            if os.path.isfile(trajectory_io.metadata_path(path)):
+                size += os.path.getsize(trajectory_io.metadata_path(path))
+
+            entries.append((stat.st_mtime, path, size))
+
+        return entries
+
+    def _evict(self) -> None:
+        """
+        Метод удаления давно использованных результатов сверх объема кэша.
+
+        :return: None
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+
+        # Последний сохраненный результат не удаляется
+        for _, path, size in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+
+            os.remove(path)
+
+            if os.path.isfile(trajectory_io.metadata_path(path)):
+                os.remove(trajectory_io.metadata_path(path))
+
+            total -= size
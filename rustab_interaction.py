@@ -1,18 +1,40 @@
 import csv
 import locale
+import os
 from typing import List, Union
-import win32com.client
 import pandas as pd
 import numpy as np
+import features
+import trajectory_io
+from metrics import CountingProxy, registry, stage_timer
+from solver_backend import LazyRastr
 
-rastr = win32com.client.Dispatch("Astra.Rastr")
+# Экземпляр расчетного ядра создается при первом обращении
+rastr = CountingProxy(LazyRastr())
+
+# Индексы таблиц: (таблица, ключевой столбец) -> {значение ключа: индекс строки}
+_index_cache = {}
+
+# Загруженный базовый случай: вид файла -> (путь, время изменения, размер, шаблон),
+# 'kpr_entries' -> параметры построенных контролируемых величин
+_base_case = {}
+
+# Виды файлов базового случая по расширению
+BASE_CASE_KINDS = {'.rst': 'rst', '.scn': 'scn', '.dfw': 'dfw', '.kpr': 'kpr'}
+
+# Повторное использование режима после расчета динамики без перезагрузки .rst
+# (включать, если расчетное ядро восстанавливает исходный режим после FWDynamic)
+REUSE_REGIME = os.environ.get('RASTR_REUSE_REGIME', '0') == '1'
 
 
 class PowerPlantAnalyzer:
     """
     Класс, описывающий станцию
     """
-    RASTR = win32com.client.Dispatch("Astra.Rastr")
+    RASTR = CountingProxy(LazyRastr())
+
+    # Снимки мощностей генераторов: (путь к режиму, время изменения) -> {Num: P}
+    _snapshots = {}
 
     def __init__(self, power_plant, mode):
         """
@@ -24,58 +46,198 @@ class PowerPlantAnalyzer:
         self.power_plant = power_plant
         self.mode = mode
 
-    def calculate_initial_power(self):
+    def _get_snapshot(self) -> dict:
         """
-        Метод для расчета начальной мощности всех генераторов.
+        Метод получения мощностей генераторов режима.
+        Режим загружается один раз и повторно читается только после изменения файла.
 
-        :return: Сумма начальных мощностей генераторов.
+        :return: Словарь {номер генератора: мощность}.
         """
+        path = os.path.abspath(self.mode)
+        key = (path, os.path.getmtime(path))
+
+        snapshot = self._snapshots.get(key)
+        registry.increment('power_plant_snapshot_total', {'result': 'miss' if snapshot is None else 'hit'})
 
-        initial_power = 0
+        if snapshot is None:
+            with stage_timer('power_plant_load'):
+                self.RASTR.Load(1, self.mode, "")
+                columns = read_table_columns(self.RASTR.Tables("Generator"), ["Num", "P"])
+                snapshot = dict(zip(columns["Num"].tolist(), columns["P"].tolist()))
 
-        for generator in self.power_plant.values():
-            self.RASTR.Load(1, self.mode, "")
-            index = 0
-            table = self.RASTR.Tables("Generator")
-            column_item = table.Cols("Num")
+            # Снимки устаревших версий файла больше не понадобятся
+            for stale_key in [stale_key for stale_key in self._snapshots if stale_key[0] == path]:
+                del self._snapshots[stale_key]
 
-            for i in range(table.Count):
-                if column_item.Z(i) == generator:
-                    index = i
-                    break
+            self._snapshots[key] = snapshot
 
-            column_item = table.Cols("P")
-            generator_power = column_item.Z(index)
-            initial_power += generator_power
+        return snapshot
+
+    def get_power_breakdown(self) -> dict:
+        """
+        Метод получения мощности каждого генератора станции.
 
-        return initial_power
+        :return: Словарь, где ключи — названия генераторов, значения — мощности.
+        """
+        snapshot = self._get_snapshot()
+        breakdown = {}
+
+        for name, generator in self.power_plant.items():
+            if generator not in snapshot:
+                raise Exception(f"Генератор с номером {generator} не найден")
+
+            breakdown[name] = snapshot[generator]
+
+        return breakdown
+
+    def calculate_initial_power(self):
+        """
+        Метод для расчета начальной мощности всех генераторов.
+
+        :return: Сумма начальных мощностей генераторов.
+        """
+        return sum(self.get_power_breakdown().values())
 
     def get_generator_power(self):
         """
         Метод для получения мощности единицы генерирующего оборудования.
 
-        :return: Сумма начальных мощностей генераторов.
+        :return: Мощность первого генератора станции.
         """
+        breakdown = self.get_power_breakdown()
+        return next(iter(breakdown.values()), 0)
+
+def set_backend(backend: str) -> None:
+    """
+    Функция замены расчетного ядра модуля
+    :param backend: Наименование реализации ('com' или 'stub')
+    :return: None
+    """
+    global rastr
 
-        power = 0
+    rastr = CountingProxy(LazyRastr(backend))
+    PowerPlantAnalyzer.RASTR = CountingProxy(LazyRastr(backend))
+    PowerPlantAnalyzer._snapshots.clear()
+    invalidate_index()
+    invalidate_base_case()
+
+def read_table_columns(table: any, columns: list) -> dict:
+    """
+    Функция чтения столбцов таблицы RUSTab за один проход
+    :param table: Объект таблицы RUSTab
+    :param columns: Список наименований столбцов
+    :return: Словарь {столбец: массив NumPy}
+    """
+    count = table.Count
+
+    try:
+        # Чтение всех столбцов одним COM-вызовом
+        data = np.array(table.ReadSafeArray(2, ",".join(columns), ""), dtype=object)
 
-        for generator in self.power_plant.values():
-            self.RASTR.Load(1, self.mode, "")
-            index = 0
-            table = self.RASTR.Tables("Generator")
-            column_item = table.Cols("Num")
+        if data.shape == (len(columns), count) and data.shape != (count, len(columns)):
+            data = data.T
 
-            for i in range(table.Count):
-                if column_item.Z(i) == generator:
-                    index = i
-                    break
+        if data.shape != (count, len(columns)):
+            raise ValueError(f"Неожиданная размерность массива {data.shape}")
 
-            column_item = table.Cols("P")
-            generator_power = column_item.Z(index)
-            power += generator_power
-            break
+        values = [data[:, position].tolist() for position in range(len(columns))]
+
+    except Exception:
+        # Версии RUSTab без ReadSafeArray: поячеечное чтение
+        values = []
+        for column in columns:
+            column_item = table.Cols.Item(column)
+            values.append([column_item.Z(index) for index in range(0,count,1)])
+
+    return {column: np.array(column_values) for column, column_values in zip(columns, values)}
+
+def read_columns(table_name: str, columns: list) -> dict:
+    """
+    Функция массового чтения столбцов таблицы рабочей области
+    :param table_name: Наименование таблицы
+    :param columns: Список наименований столбцов
+    :return: Словарь {столбец: массив NumPy}
+    """
+    return read_table_columns(rastr.Tables.Item(table_name), columns)
+
+def invalidate_index(table_name: str = None) -> None:
+    """
+    Функция сброса индексов таблиц
+    :param table_name: Наименование таблицы (None - сброс всех индексов)
+    :return: None
+    """
+    if table_name is None:
+        _index_cache.clear()
+        return
 
-        return power
+    for key in [key for key in _index_cache if key[0] == table_name]:
+        del _index_cache[key]
+
+def invalidate_base_case(kind: str = None) -> None:
+    """
+    Функция сброса сведений о загруженном базовом случае
+    :param kind: Вид файла ('rst', 'scn', 'dfw', 'kpr'; None - сброс всех)
+    :return: None
+    """
+    if kind is None:
+        _base_case.clear()
+        return
+
+    _base_case.pop(kind, None)
+
+    # Контролируемые величины строятся поверх загруженного файла .kpr
+    if kind == 'kpr':
+        _base_case.pop('kpr_entries', None)
+
+def _invalidate_loaded(file_path: str) -> None:
+    """
+    Функция сброса сведений о базовом случае для файла, загруженного в обход file_prepare
+    :param file_path: Путь к файлу или шаблону
+    :return: None
+    """
+    kind = BASE_CASE_KINDS.get(os.path.splitext(file_path)[1].lower())
+    invalidate_base_case(kind)
+
+def get_table_index(table_name: str, parameter_name: str) -> dict:
+    """
+    Функция получения индекса таблицы по ключевому столбцу.
+    Индекс строится один раз и хранится до загрузки нового файла
+    :param table_name: Наименование таблицы
+    :param parameter_name: Наименование ключевого столбца
+    :return: Словарь {значение ключа: индекс строки}
+    """
+    key = (table_name, parameter_name.lower())
+    index_map = _index_cache.get(key)
+    registry.increment('rustab_index_total', {'result': 'miss' if index_map is None else 'hit'})
+
+    if index_map is None:
+        values = read_columns(table_name, [parameter_name])[parameter_name]
+
+        index_map = {}
+        for index, value in enumerate(values.tolist()):
+            # При совпадающих значениях сохраняется первая строка, как при линейном поиске
+            index_map.setdefault(value, index)
+
+        _index_cache[key] = index_map
+
+    return index_map
+
+def _update_index(table_name: str, parameter_name: str, index: int, value: any) -> None:
+    """
+    Функция обновления индексов таблицы после добавления строки
+    :param table_name: Наименование таблицы
+    :param parameter_name: Наименование заполненного столбца
+    :param index: Индекс добавленной строки
+    :param value: Значение заполненного столбца
+    :return: None
+    """
+    for key in [key for key in _index_cache if key[0] == table_name]:
+        if key[1] == parameter_name.lower():
+            _index_cache[key].setdefault(value, index)
+
+        else:
+            # Остальные столбцы новой строки заполнены значениями по умолчанию
+            del _index_cache[key]
 
 def load_file(file_path: str, shablon: str) -> None:
     """
@@ -85,6 +247,8 @@ def load_file(file_path: str, shablon: str) -> None:
     :return: None
     """
     rastr.Load(1, file_path, shablon)
+    invalidate_index()
+    _invalidate_loaded(file_path)
 
 def save_file(file_name: str, shablon: str) -> None:
     """
@@ -105,6 +269,8 @@ def create_file(shablon: str) -> None:
     :return: None
     """
     rastr.NewFile(shablon)
+    invalidate_index()
+    _invalidate_loaded(shablon)
 
 def get_index_by_number(table_name: str, parameter_name: str, number: int) -> int:
     """
@@ -114,14 +280,12 @@ def get_index_by_number(table_name: str, parameter_name: str, number: int) -> in
     :param number: Номер узла
     :return: Индекс
     """
-    table = rastr.Tables.Item(table_name)
-    column_item = table.Cols.Item(parameter_name)
+    index = get_table_index(table_name, parameter_name).get(number)
 
-    for index in range(0,table.Count,1):
-        if column_item.Z(index) == number:
-            return index
+    if index is None:
+        raise Exception(f"Элемент с номером {number} не найден")
 
-    raise Exception(f"Элемент с номером {number} не найден")
+    return index
 
 def get_index_by_value(table_name: str, parameter_name: str, value: str) -> int:
     """
@@ -131,14 +295,12 @@ def get_index_by_value(table_name: str, parameter_name: str, value: str) -> int:
     :param value: Параметр узла
     :return: Индекс
     """
-    table = rastr.Tables.Item(table_name)
-    column_item = table.Cols.Item(parameter_name)
+    index = get_table_index(table_name, parameter_name).get(value)
 
-    for index in range(0,table.Count,1):
-        if column_item.Z(index) == value:
-            return index
+    if index is None:
+        raise Exception(f"Элемент {value} не найден")
 
-    raise Exception(f"Элемент {value} не найден")
+    return index
 
 def set_value(table_name: str, parameter_name: str, number: int,
                    chosen_parameter: str, value: any) -> None:
@@ -157,6 +319,9 @@ def set_value(table_name: str, parameter_name: str, number: int,
     index = get_index_by_number(table_name, parameter_name, number)
     column_item.SetZ(index, value)
 
+    # Изменение ключевого столбца делает его индекс неактуальным
+    _index_cache.pop((table_name, chosen_parameter.lower()), None)
+
 def change_branch_state(ip_number: int, iq_number: int, np_number: int,
                         state: bool) -> None:
     """
@@ -167,24 +332,18 @@ def change_branch_state(ip_number: int, iq_number: int, np_number: int,
     :param state: Состояние ветви
     :return: None
     """
-    table = rastr.Tables.Item("vetv")
+    columns = read_columns("vetv", ["ip", "iq", "np"])
 
-    ip_column_item = table.Cols.Item("ip")
-    iq_column_item = table.Cols.Item("iq")
-    np_column_item = table.Cols.Item("np")
-    sta_column_item = table.Cols.Item("sta")
+    mask = (columns["ip"] == ip_number) & (columns["iq"] == iq_number)
 
-    for index in range(0,table.Count,1):
-        if (ip_column_item.get_ZN(index) == ip_number and
-            iq_column_item.get_ZN(index) == iq_number):
+    if np_number != 0:
+        mask &= columns["np"] == np_number
 
-            if np_number == 0:
-                sta_column_item.set_ZN(index, state)
-                break
+    matches = np.flatnonzero(mask)
 
-            elif np_column_item.get_ZN(index) == np_number:
-                sta_column_item.set_ZN(index, state)
-                break
+    if matches.size:
+        sta_column_item = rastr.Tables.Item("vetv").Cols.Item("sta")
+        sta_column_item.set_ZN(int(matches[0]), state)
 
 def get_generator_list(is_plant_researched: bool) -> list:
     """
@@ -192,25 +351,15 @@ def get_generator_list(is_plant_researched: bool) -> list:
     :param is_plant_researched: Исследуемая ли станция
     :return: Список генераторов станции
     """
-    table = rastr.Tables.Item("ut_node")
-
-    ny_column_item = table.Cols.Item("ny")
-    pg_column_item = table.Cols.Item("pg")
-
-    generator_list = []
-
-    for index in range(0,table.Count,1):
-        if (pg_column_item.get_ZN(index) > 0 and
-            is_plant_researched):
-
-            generator_list.append(ny_column_item.get_ZN(index))
+    columns = read_columns("ut_node", ["ny", "pg"])
 
-        elif (pg_column_item.get_ZN(index) < 0 and
-              is_plant_researched == False):
+    if is_plant_researched:
+        mask = columns["pg"] > 0
 
-            generator_list.append(ny_column_item.get_ZN(index))
+    else:
+        mask = columns["pg"] < 0
 
-    return generator_list
+    return columns["ny"][mask].tolist()
 
 def get_value (table_name: str, parameter_name: str, number: int,
                chosen_parameter: str) -> any:
@@ -255,16 +404,8 @@ def fill_numbers_list(table_name: str, parameter_name: str) -> list:
     :param parameter_name: Наименование параметра
     :return: Список значений
     """
-    list_of_numbers = []
-
     try:
-        table = rastr.Tables.Item(table_name)
-        column_item = table.Cols.Item(parameter_name)
-
-        for index in range(0,table.Count,1):
-            list_of_numbers.append(column_item.get_ZN(index))
-
-        return list_of_numbers
+        return read_columns(table_name, [parameter_name])[parameter_name].tolist()
 
     except Exception as ex:
         raise Exception(str(ex))
@@ -303,6 +444,7 @@ def add_row(table_name: str, index: int, number: int) -> None:
     table = rastr.Tables(table_name)
     table.AddRow()
     rastr.Tables(table_name).Cols("id").SetZ(index, number)
+    _update_index(table_name, "id", index, number)
     #column_item = table.Cols("id")
     #column_item.setZ(index, number)
 
@@ -317,9 +459,50 @@ def add_kpr(table_name: str, index: int, number: int) -> None:
     table = rastr.Tables.Item(table_name)
     table.AddRow()
     rastr.Tables(table_name).Cols("Num").SetZ(index, number)
+    _update_index(table_name, "Num", index, number)
     #column_item = table.Cols.Item("Num")
     #column_item.setZ(index, number)
 
+def write_rows(table_name: str, columns: list, rows: list) -> None:
+    """
+    Функция пакетной записи строк в конец таблицы
+    :param table_name: Наименование таблицы
+    :param columns: Список наименований столбцов
+    :param rows: Список строк, значения в порядке columns
+    :return: None
+    """
+    if not rows:
+        return
+
+    table = rastr.Tables.Item(table_name)
+    start = table.Count
+
+    try:
+        # Расширение таблицы сразу на все строки
+        table.Size = start + len(rows)
+
+    except Exception:
+        for _ in rows:
+            table.AddRow()
+
+    try:
+        # Запись всех строк одним COM-вызовом: массив ложится с первой строки,
+        # поэтому так заполняется только пустая таблица (сценарий после NewFile)
+        if start:
+            raise ValueError("Таблица не пуста")
+
+        table.WriteSafeArray(2, ",".join(columns), tuple(tuple(row) for row in rows))
+
+    except Exception:
+        # Версии RUSTab без WriteSafeArray: поячеечная запись без поиска индексов
+        for position, column in enumerate(columns):
+            column_item = table.Cols.Item(column)
+
+            for offset, row in enumerate(rows):
+                column_item.SetZ(start + offset, row[position])
+
+    invalidate_index(table_name)
+
 def add_action_row(table: str, index: int, parent_id: int, action_type: any,
                    formula: any, object_key: any, output_mode=0, runs_count=1) -> None:
     """
@@ -362,6 +545,69 @@ def add_logic_row(table: str, index: int, actions: any, delay: float,
     set_value(table, "Id", index, "Delay", delay)
     set_value(table, "Id", index, "OutputMode", output_mode)
 
+class ScenarioBuilder:
+    """
+    Класс, накапливающий действия и логику сценария для пакетной записи
+    """
+    ACTION_TABLE = "DFWAutoActionScn"
+    LOGIC_TABLE = "DFWAutoLogicScn"
+
+    ACTION_COLUMNS = ["Id", "ParentId", "Type", "Formula", "ObjectKey", "OutputMode", "RunsCount"]
+    LOGIC_COLUMNS = ["Id", "Formula", "Type", "Actions", "Delay", "OutputMode"]
+
+    def __init__(self):
+        """
+        Инициализация класса.
+        """
+        self.actions = []
+        self.logic = []
+
+    def add_action(self, parent_id: int, action_type: any, formula: any,
+                   object_key: any, output_mode=0, runs_count=1) -> int:
+        """
+        Метод добавления действия сценария.
+
+        :param parent_id: Родительский объект
+        :param action_type: Тип действия
+        :param formula: Формула
+        :param object_key: Ключ объекта
+        :param output_mode: Выходное состояние
+        :param runs_count: Количество пробегов
+        :return: Идентификатор действия
+        """
+        index = len(self.actions) + 1
+        self.actions.append([index, parent_id, action_type, formula,
+                             object_key, output_mode, runs_count])
+        return index
+
+    def add_logic(self, actions: any, delay: float, formula=1,
+                  logic_type=1, output_mode=0) -> int:
+        """
+        Метод добавления логики сценария.
+
+        :param actions: Действия
+        :param delay: Выдержка времени
+        :param formula: Формула
+        :param logic_type: Тип логики
+        :param output_mode: Выходное состояние
+        :return: Идентификатор логики
+        """
+        index = len(self.logic) + 1
+        self.logic.append([index, formula, logic_type, actions, delay, output_mode])
+        return index
+
+    def flush(self) -> None:
+        """
+        Метод записи накопленных строк в таблицы сценария.
+
+        :return: None
+        """
+        write_rows(self.ACTION_TABLE, self.ACTION_COLUMNS, self.actions)
+        write_rows(self.LOGIC_TABLE, self.LOGIC_COLUMNS, self.logic)
+
+        self.actions = []
+        self.logic = []
+
 def make_scn_1 (shunt: float, shunt_recloser: float, protection_delay: float,
                 recloser_delay: float, fault_node: int, new_fault_node: int,
                 line_1: str, line_2: str, line_3: str, line_4: str) -> None:
@@ -380,30 +626,31 @@ def make_scn_1 (shunt: float, shunt_recloser: float, protection_delay: float,
     :return: None
     """
 
+    scenario = ScenarioBuilder()
+
     # Формирование действий сценария
-    add_action_row("DFWAutoActionScn", 1, 1, 6, shunt, fault_node)
-    add_action_row("DFWAutoActionScn", 2, 2, 3, 0, line_1)
-    add_action_row("DFWAutoActionScn", 3, 2, 3, 0, line_2)
-    add_action_row("DFWAutoActionScn", 4, 3, 5, 0, new_fault_node)
-    add_action_row("DFWAutoActionScn", 5, 4, 6, shunt_recloser, new_fault_node)
-    add_action_row("DFWAutoActionScn", 6, 5, 3, 0, line_3)
-    add_action_row("DFWAutoActionScn", 7, 5, 3, 0, line_4)
-    add_action_row("DFWAutoActionScn", 8, 6, 3, 1, line_3)
-    add_action_row("DFWAutoActionScn", 9, 6, 3, 1, line_4)
-    add_action_row("DFWAutoActionScn", 10, 7, 3, 0, line_3)
-    add_action_row("DFWAutoActionScn", 11, 7, 3, 0, line_4)
+    scenario.add_action(1, 6, shunt, fault_node)
+    scenario.add_action(2, 3, 0, line_1)
+    scenario.add_action(2, 3, 0, line_2)
+    scenario.add_action(3, 5, 0, new_fault_node)
+    scenario.add_action(4, 6, shunt_recloser, new_fault_node)
+    scenario.add_action(5, 3, 0, line_3)
+    scenario.add_action(5, 3, 0, line_4)
+    scenario.add_action(6, 3, 1, line_3)
+    scenario.add_action(6, 3, 1, line_4)
+    scenario.add_action(7, 3, 0, line_3)
+    scenario.add_action(7, 3, 0, line_4)
 
     # Формирование логики сценария
-    add_logic_row("DFWAutoLogicScn", 1, "A1", 0)
-    add_logic_row("DFWAutoLogicScn", 2, "A2", protection_delay)
-    add_logic_row("DFWAutoLogicScn", 3, "A3", protection_delay)
-    add_logic_row("DFWAutoLogicScn", 4, "A4", protection_delay)
-    add_logic_row("DFWAutoLogicScn", 5, "A5",
-                  protection_delay + 0.05)
-    add_logic_row("DFWAutoLogicScn", 6, "A6",
-                  protection_delay + 0.05 + recloser_delay)
-    add_logic_row("DFWAutoLogicScn", 7, "A7",
-                  2 * protection_delay + 0.05 + recloser_delay)
+    scenario.add_logic("A1", 0)
+    scenario.add_logic("A2", protection_delay)
+    scenario.add_logic("A3", protection_delay)
+    scenario.add_logic("A4", protection_delay)
+    scenario.add_logic("A5", protection_delay + 0.05)
+    scenario.add_logic("A6", protection_delay + 0.05 + recloser_delay)
+    scenario.add_logic("A7", 2 * protection_delay + 0.05 + recloser_delay)
+
+    scenario.flush()
 
 def add_logic_row_3(table: str, index: int, formula: int, logic_type: any,
                     actions: any, delay: float, output_mode=0) -> None:
@@ -442,22 +689,23 @@ def make_scn_3(shunt: float, protection_delay: float,
     :return: None
     """
 
+    scenario = ScenarioBuilder()
+
     # Формирование действий сценария
-    add_action_row("DFWAutoActionScn", 1, 1, 6, shunt, fault_node)
-    add_action_row("DFWAutoActionScn", 2, 2, 3, 0, line_1)
-    add_action_row("DFWAutoActionScn", 3, 3, 3, 0, line_2)
-    add_action_row("DFWAutoActionScn", 4, 3, 3, 0, line_3)
-    add_action_row("DFWAutoActionScn", 5, 4, 3, 0, line_4)
-    add_action_row("DFWAutoActionScn", 6, 4, 3, 0, line_5)
+    scenario.add_action(1, 6, shunt, fault_node)
+    scenario.add_action(2, 3, 0, line_1)
+    scenario.add_action(3, 3, 0, line_2)
+    scenario.add_action(3, 3, 0, line_3)
+    scenario.add_action(4, 3, 0, line_4)
+    scenario.add_action(4, 3, 0, line_5)
 
     # Формирование логики сценария
-    add_logic_row_3("DFWAutoLogicScn", 1, 1, 1, "A1", 0)
-    add_logic_row_3("DFWAutoLogicScn", 2, 1, 1, "A2",
-                    protection_delay)
-    add_logic_row_3("DFWAutoLogicScn", 3, 1, 1, "A3",
-                    protection_delay + 0.05)
-    add_logic_row_3("DFWAutoLogicScn", 4, 1, 1, "A4",
-                    protection_delay + 0.05 + cbfp_delay)
+    scenario.add_logic("A1", 0)
+    scenario.add_logic("A2", protection_delay)
+    scenario.add_logic("A3", protection_delay + 0.05)
+    scenario.add_logic("A4", protection_delay + 0.05 + cbfp_delay)
+
+    scenario.flush()
 
 def calculate_dynamic(input_width: float, start_step: float, min_step: float,
                       max_step: float, out_step: float) -> None:
@@ -498,6 +746,11 @@ def calculate_dynamic(input_width: float, start_step: float, min_step: float,
     except Exception as ex:
         raise Exception(str(ex))
 
+    finally:
+        # После расчета режим в рабочей области может отличаться от исходного
+        if not REUSE_REGIME:
+            invalidate_base_case('rst')
+
 def file_prepare(rst_file: str, scn_file: str, dfw_file: str, shablon_scn: str,
                  kpr_file: str, name: str, data_set: str,
                  name_support: str, set_support: str) -> None:
@@ -514,11 +767,36 @@ def file_prepare(rst_file: str, scn_file: str, dfw_file: str, shablon_scn: str,
     :param set_support: Выборка для опорного генератора
     :return: None
     """
-    rastr.Load(1, rst_file, "")
-    rastr.Load(1, scn_file, shablon_scn)
-    rastr.Load(1, dfw_file, dfw_file)
-    rastr.Load(1, kpr_file, kpr_file)
-    create_kpr(name, data_set, name_support, set_support)
+    kpr_entries = (name, data_set, name_support, set_support)
+
+    # Контролируемые величины добавляются к строкам файла .kpr: при других
+    # параметрах файл загружается заново
+    if _base_case.get('kpr_entries') != kpr_entries:
+        invalidate_base_case('kpr')
+
+    # Загружаются только файлы, измененные с предыдущей подготовки
+    loaded = False
+    for kind, file_path, shablon in (('rst', rst_file, ""), ('scn', scn_file, shablon_scn),
+                                     ('dfw', dfw_file, dfw_file), ('kpr', kpr_file, kpr_file)):
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        signature = (path, stat.st_mtime_ns, stat.st_size, shablon)
+
+        if _base_case.get(kind) == signature:
+            registry.increment('base_case_load_total', {'file': kind, 'result': 'reused'})
+            continue
+
+        registry.increment('base_case_load_total', {'file': kind, 'result': 'loaded'})
+        rastr.Load(1, file_path, shablon)
+        _base_case[kind] = signature
+        loaded = True
+
+    if loaded:
+        invalidate_index()
+
+    if 'kpr_entries' not in _base_case:
+        create_kpr(name, data_set, name_support, set_support)
+        _base_case['kpr_entries'] = kpr_entries
 
 def configure_kpr_entry(num: int, entry_name: str, entry_set: str) -> None:
     """
@@ -551,20 +829,78 @@ def create_kpr(name: str, data_set: str, name_support: str, set_support: str) ->
     add_kpr("ots_val", 1, 2)
     configure_kpr_entry(2, name_support, set_support)
 
-def get_transient(name: str, parameter: str, key: int, plant: str, index: int) -> str:
+def get_transient_array(name: str, parameter: str, key: int) -> np.ndarray:
     """
-    Функция сохранения результатов в CSV
+    Функция получения переходного процесса из рабочей области
+    :param name: Наименование таблицы
+    :param parameter: Наименование параметра
+    :param key: Номер элемента
+    :return: Массив строк (значение, время)
+    """
+    index = get_index_by_number(name, "Num", key)
+    return np.array(rastr.GetChainedGraphSnapshot(name, parameter, index, 0), dtype=float)
+
+def get_transient_channels(channels: dict) -> tuple:
+    """
+    Функция получения нескольких переходных процессов из рабочей области за один проход
+    :param channels: Словарь {наименование столбца: (таблица, параметр, номер элемента)}
+    :return: Массив (точки, каналы + 1) со временем в последнем столбце и наименования столбцов
+    """
+    plots = [get_transient_array(name, parameter, key) for name, parameter, key in channels.values()]
+
+    # Каналы приводятся к времени первого канала
+    t = plots[0][:, 1]
+    values = np.empty((len(t), len(plots) + 1))
+
+    for position, plot in enumerate(plots):
+        if len(plot) == len(t) and np.array_equal(plot[:, 1], t):
+            values[:, position] = plot[:, 0]
+
+        else:
+            values[:, position] = np.interp(t, plot[:, 1], plot[:, 0])
+
+    values[:, -1] = t
+
+    return values, list(channels) + ["t"]
+
+def power_channels(generators: dict) -> dict:
+    """
+    Функция формирования каналов активной мощности генераторов станции
+    :param generators: Словарь генераторов {наименование: номер}
+    :return: Словарь {p_<номер>: ("Generator", "P", номер)}
+    """
+    return {f"{features.POWER_PREFIX}{number}": ("Generator", "P", number) for number in generators.values()}
+
+def result_path(plant: str, index: int, output_format: str = "npy") -> str:
+    """
+    Функция формирования пути к файлу результата
+    :param plant: Наименование станции
+    :param index: Порядковый номер результата
+    :param output_format: Формат файла: "npy" или "csv"
+    :return: Путь к файлу результата
+    """
+    return f"C:\\Users\\Umaro\\OneDrive\\Рабочий стол\\res\\Python_{plant}_{index}.{output_format}"
+
+def get_transient(name: str, parameter: str, key: int, plant: str, index: int,
+                  output_format: str = "npy", channels: dict = None) -> str:
+    """
+    Функция сохранения результатов
     :param name: Наименование таблицы
     :param parameter: Наименование параметра
     :param key: Номер генератора
     :param plant: Наименование станции
     :param index: Порядковый номер результата
+    :param output_format: Формат файла: "npy" (двоичный) или "csv"
+    :param channels: Дополнительные каналы {наименование столбца: (таблица, параметр, номер)}
     :return: Наименование файла с результатом
     """
-    gen_id = get_index_by_number(name, "Num", key)
-    plot = rastr.GetChainedGraphSnapshot(name, parameter, gen_id, 0)
+    plot, columns = get_transient_channels(dict({"delta": (name, parameter, key)}, **(channels or {})))
 
-    save_path = f"C:\\Users\\Umaro\\OneDrive\\Рабочий стол\\res\\Python_{plant}_{index}.csv"
+    save_path = result_path(plant, index, output_format)
+
+    if output_format == "npy":
+        step = float(np.median(np.diff(plot[:, -1]))) if len(plot) > 1 else None
+        return trajectory_io.save_trajectory(save_path, plot, columns, step)
 
     #Установка региональных настроек для форматирования чисел
     locale.setlocale(locale.LC_NUMERIC, "ru_RU")
@@ -574,7 +910,7 @@ def get_transient(name: str, parameter: str, key: int, plant: str, index: int) -
         writer = csv.writer(file, delimiter=';')
 
         # Запись заголовков
-        writer.writerow(["delta", "t"])
+        writer.writerow(columns)
 
         # Запись данных
         for row in plot:
@@ -583,77 +919,56 @@ def get_transient(name: str, parameter: str, key: int, plant: str, index: int) -
 
     return save_path
 
-def preprocessing(input_path: str, output_path: str, generators: dict, rst_file: str) -> None:
+def preprocess_frame(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Функция предобработки переходного процесса в памяти (обертка features.preprocess)
+    :param data: Датафрейм со столбцом delta (и, возможно, t и мощностями генераторов p_<номер>)
+    :return: Датафрейм с нормализованными столбцами delta, w, a, p
     """
-    Функция предобработки данных
+    normalized, _ = features.preprocess(data.to_numpy(dtype=float), list(data.columns))
+    return pd.DataFrame(normalized, columns=features.FEATURE_COLUMNS)
+
+def preprocessing(input_path: str, output_path: str) -> None:
+    """
+    Функция предобработки данных с сохранением масштаба признаков в описании рядом с файлом
     :param input_path: Исходный файл
     :param output_path: Выходной файл
-    :param generators: Словарь генераторов
-    :param rst_file: Файл режима
     :return: None
     """
-    locale.setlocale(locale.LC_NUMERIC, "ru_RU")
+    step = None
 
     # Считываем данные
-    data = pd.read_csv(input_path, delimiter=';', encoding='utf-8')
-
-    # Заменяем запятую на точку и преобразуем в float
-    data['delta'] = data['delta'].str.replace(',', '.').astype(float)
-
-    # Вычисляем первую производную
-    data['w'] = np.gradient(data['delta'].values)
+    if trajectory_io.is_binary(input_path):
+        # Файл читается целиком: результат может перезаписать исходный файл
+        array, metadata = trajectory_io.load_trajectory(input_path, mmap=False)
+        columns = metadata['columns']
+        step = metadata.get('step')
 
-    # Вычисляем вторую производную
-    data['a'] = np.gradient(data['w'].values)
-
-    plant = PowerPlantAnalyzer(generators, rst_file)
-    power = plant.calculate_initial_power()
-    gen_power = plant.get_generator_power()
-
-    # Ввод управляющего воздействия
-    n = len(data)
-    data['p'] = 2700
-    data.loc[36:n, 'p'] = 2000
-
-    # Удаляем столбец 't'
-    if 't' in data.columns:
-        data.drop(columns=['t'], inplace=True)
+    else:
+        array, columns = trajectory_io.read_csv_trajectory(input_path)
 
-    # Нормализация столбцов
-    for column in ['delta', 'w', 'a', 'p']:
-        data[column] = (data[column] - data[column].min()) / (data[column].max() - data[column].min())
+    data, scaler = features.preprocess(array, columns)
 
     # Сохранение нормализованных данных
-    data.to_csv(output_path, sep=';', encoding='utf-8', index=False, float_format='%.6f')
+    if trajectory_io.is_binary(output_path):
+        trajectory_io.save_trajectory(output_path, data, features.FEATURE_COLUMNS, step,
+                                      scaler=scaler.tolist())
+
+    else:
+        np.savetxt(output_path, data, fmt='%.6f', delimiter=';',
+                   header=';'.join(features.FEATURE_COLUMNS), comments='', encoding='utf-8')
+        trajectory_io.write_metadata(output_path, columns=features.FEATURE_COLUMNS, step=step,
+                                     rows=len(data), scaler=scaler.tolist())
 
 def parse_csv_to_array(file_path: str) -> List[List[Union[float, int]]]:
     """
-    Функция преобразования файла csv в массив переменных
-    :param file_path: Путь к файлу переходного процесса
+    Функция преобразования файла переходного процесса в массив переменных
+    :param file_path: Путь к файлу переходного процесса (.csv или .npy)
     :return: Многомерный массив переходного процесса
+    :raises FileNotFoundError: Файл не существует
+    :raises ValueError: Файл не удалось разобрать
     """
-    data = []
-
-    try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            reader = csv.reader(file, delimiter=';')
-
-            # Пропускаем заголовок
-            next(reader, None)
-
-            for row in reader:
-                data.append([float(value.replace(',', '.')) for value in row])
-
-    except FileNotFoundError:
-        print(f"Файла {file_path} не существует")
-
-    except ValueError as ve:
-        print(f"Ошибка преобразование {ve}")
-
-    except Exception as e:
-        print(f"Ошибка {e}")
-
-    return data
+    return trajectory_io.read_trajectory(file_path).tolist()
 
 def add_array_to_csv(array: list, file_path: str) -> None:
     """
@@ -0,0 +1,121 @@
+import itertools
+import json
+import os
+from typing import Iterator
+
+import numpy as np
+
+from solver_pool import SolverPool, simulate_scenario
+
+# Функции формирования сценариев по номеру группы
+SCENARIO_GROUPS = {1: 'make_scn_1', 3: 'make_scn_3'}
+
+# Количество линий в наборе для группы сценариев
+LINES_PER_GROUP = {1: 4, 3: 5}
+
+
+def expand_grid(grid: dict, group: int = None) -> Iterator[dict]:
+    """
+    Функция ленивого перебора сочетаний параметров сценария.
+    Значение параметра - список вариантов или одно значение; ключ 'lines'
+    задает список наборов линий, раскладываемых в line_1, line_2, ...
+    Массивы и скаляры NumPy приводятся к типам Python для записи описи в JSON
+    :param grid: Словарь {параметр make_scn_*: варианты}
+    :param group: Группа сценариев для проверки длины наборов линий (None - без проверки)
+    :return: Генератор словарей параметров
+    """
+    grid = {name: value.tolist() if isinstance(value, (np.ndarray, np.generic)) else value
+            for name, value in grid.items()}
+
+    if 'lines' in grid:
+        lines = grid['lines']
+
+        if not isinstance(lines, (list, tuple)) or not all(isinstance(line_set, (list, tuple))
+                                                           for line_set in lines):
+            raise Exception("Ключ 'lines' задает список наборов линий, "
+                            "например [['L1', 'L2', 'L3', 'L4']]")
+
+        expected = LINES_PER_GROUP.get(group)
+        for line_set in lines:
+            if expected is not None and len(line_set) != expected:
+                raise Exception(f"Набор линий {list(line_set)} для группы {group} "
+                                f"должен содержать {expected} линий")
+
+    names = list(grid)
+    options = [value if isinstance(value, (list, tuple, range)) else [value]
+               for value in grid.values()]
+
+    for values in itertools.product(*options):
+        params = dict(zip(names, values))
+
+        for position, line in enumerate(params.pop('lines', ()), start=1):
+            params[f'line_{position}'] = line
+
+        yield params
+
+def write_scenario(group: int, params: dict, scn_file: str, shablon_scn: str) -> str:
+    """
+    Функция формирования и сохранения файла сценария
+    :param group: Группа сценария (1 или 3)
+    :param params: Параметры функции make_scn_* группы
+    :param scn_file: Путь к файлу сценария
+    :param shablon_scn: Шаблон сценария
+    :return: Путь к файлу сценария
+    """
+    import rustab_interaction
+
+    if group not in SCENARIO_GROUPS:
+        raise Exception(f"Группа сценариев {group} не поддерживается")
+
+    rustab_interaction.create_file(shablon_scn)
+    getattr(rustab_interaction, SCENARIO_GROUPS[group])(**params)
+    rustab_interaction.save_file(scn_file, shablon_scn)
+
+    return scn_file
+
+def build_and_simulate(task: dict) -> np.ndarray:
+    """
+    Функция формирования сценария и его расчета в рабочем процессе
+    :param task: Задание simulate_scenario с дополнительными ключами group и params
+    :return: Массив строк переходного процесса (значение, время)
+    """
+    write_scenario(task['group'], task['params'], task['scn_file'], task['shablon_scn'])
+    return simulate_scenario(task)
+
+def sweep_tasks(group: int, grid: dict, output_dir: str, base_task: dict,
+                prefix: str = 'scn') -> Iterator[dict]:
+    """
+    Функция ленивого формирования заданий перебора с записью описи сценариев
+    :param group: Группа сценариев (1 или 3)
+    :param grid: Варианты параметров (см. expand_grid)
+    :param output_dir: Каталог файлов сценариев
+    :param base_task: Общие ключи задания simulate_scenario (режим, шаблоны, КПР, расчет)
+    :param prefix: Префикс имен файлов сценариев
+    :return: Генератор заданий build_and_simulate
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    with open(os.path.join(output_dir, f"{prefix}.jsonl"), "w", encoding="utf-8") as manifest:
+        for index, params in enumerate(expand_grid(grid, group)):
+            scn_file = os.path.join(output_dir, f"{prefix}_{index:06d}.scn")
+
+            manifest.write(json.dumps({'scn_file': scn_file, 'group': group, 'params': params},
+                                      ensure_ascii=False) + "\n")
+            manifest.flush()
+
+            yield dict(base_task, group=group, params=params, scn_file=scn_file)
+
+def run_sweep(group: int, grid: dict, output_dir: str, base_task: dict,
+              pool: SolverPool, prefix: str = 'scn') -> Iterator[dict]:
+    """
+    Функция перебора сценариев с параллельным расчетом в пуле процессов
+    :param group: Группа сценариев (1 или 3)
+    :param grid: Варианты параметров (см. expand_grid)
+    :param output_dir: Каталог файлов сценариев
+    :param base_task: Общие ключи задания simulate_scenario
+    :param pool: Пул процессов расчетного ядра
+    :param prefix: Префикс имен файлов сценариев
+    :return: Генератор результатов пула по мере завершения расчетов
+    """
+    return pool.map_unordered(build_and_simulate, sweep_tasks(group, grid, output_dir,
+                                                              base_task, prefix))
@@ -0,0 +1,86 @@
+from typing import Callable
+
+import numpy as np
+
+# Этапы скрининга
+SCREENING_STAGES = ['observation', 'prediction', 'full_simulation']
+
+
+def estimate_delta(scaler: np.ndarray, predicted: np.ndarray) -> np.ndarray:
+    """
+    Функция перевода нормализованного прогноза угла в градусы по масштабу,
+    с которым нормализован вход модели
+    :param scaler: Масштаб признаков окна наблюдения (2, 4): минимумы и максимумы
+    :param predicted: Нормализованный прогноз угла
+    :return: Прогноз угла, град
+    """
+    low, high = scaler[:, 0]
+    return predicted * (high - low) + low
+
+def screen_contingencies(scenarios: list, observe: Callable, predict: Callable,
+                         simulate_full: Callable, delta_limit: float = 180.0,
+                         margin: float = 0.9, spread_limit: float = None,
+                         report=lambda stage: None) -> list:
+    """
+    Функция скрининга сценариев: короткий расчет окна наблюдения, прогноз остатка
+    моделью и полный расчет только для сомнительных сценариев
+    :param scenarios: Пути к файлам сценариев
+    :param observe: Функция observe(сценарии) -> список (угол в окне, град; нормализованное окно;
+                    масштаб признаков окна) в порядке сценариев; расчеты окон наблюдения
+                    могут выполняться параллельно
+    :param predict: Функция predict(пакет окон) -> нормализованный прогноз угла
+                    размерности (модели ансамбля, сценарии, точки)
+    :param simulate_full: Функция simulate_full(сценарий) -> угол полного расчета, град
+    :param delta_limit: Предельный угол, град
+    :param margin: Доля предельного угла, начиная с которой сценарий считается близким к неустойчивости
+    :param spread_limit: Предельный разброс прогнозов ансамбля, град (None - не проверяется)
+    :param report: Функция отметки начала этапа
+    :return: Список словарей с результатом по каждому сценарию
+    """
+    report('observation')
+    observed = []
+    windows = []
+    scalers = []
+
+    for observed_delta, window, scaler in observe(scenarios):
+        observed.append(observed_delta)
+        windows.append(window)
+        scalers.append(scaler)
+
+    report('prediction')
+    predictions = np.asarray(predict(np.stack(windows)))
+
+    results = []
+    for position, scenario in enumerate(scenarios):
+        deltas = estimate_delta(scalers[position], predictions[:, position])
+
+        peak = float(max(np.abs(observed[position]).max(), np.abs(deltas).max()))
+        spread = float(deltas.std(axis=0).max()) if len(deltas) > 1 else 0.0
+
+        reasons = []
+        if peak >= margin * delta_limit:
+            reasons.append('delta_limit')
+
+        if spread_limit is not None and spread > spread_limit:
+            reasons.append('ensemble_spread')
+
+        results.append({'scenario': scenario,
+                        'predicted_peak': peak,
+                        'ensemble_spread': spread,
+                        'flags': reasons,
+                        'peak': peak,
+                        'stable': peak < delta_limit,
+                        'source': 'surrogate'})
+
+    report('full_simulation')
+    for result in results:
+        if not result['flags']:
+            continue
+
+        full_delta = simulate_full(result['scenario'])
+
+        result['peak'] = float(np.abs(full_delta).max())
+        result['stable'] = result['peak'] < delta_limit
+        result['source'] = 'simulation'
+
+    return results
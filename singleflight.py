@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Tuple
+
+
+class SingleFlight:
+    """
+    Класс, объединяющий одновременные вызовы с одинаковым ключом в одно выполнение
+    """
+
+    def __init__(self):
+        """
+        Инициализация класса.
+        """
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key: str, func: Callable) -> Tuple[any, bool]:
+        """
+        Метод выполнения функции: пока вызов с ключом выполняется,
+        повторные вызовы ожидают его результат.
+
+        :param key: Ключ вызова.
+        :param func: Функция без аргументов.
+        :return: Результат и признак того, что функция выполнена этим вызовом.
+        """
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+
+            if leader:
+                future = Future()
+                self.calls[key] = future
+
+        if not leader:
+            return future.result(), False
+
+        try:
+            future.set_result(func())
+
+        except Exception as ex:
+            future.set_exception(ex)
+
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+        return future.result(), True
+
+    def in_flight(self) -> int:
+        """
+        Метод получения количества выполняющихся вызовов.
+
+        :return: Количество ключей в работе.
+        """
+        with self.lock:
+            return len(self.calls)
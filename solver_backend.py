@@ -0,0 +1,379 @@
+import contextvars
+import json
+import math
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+# Доступные реализации расчетного ядра
+BACKENDS = ('com', 'stub')
+
+# Таблицы файла сценария
+SCENARIO_TABLES = ('DFWAutoActionScn', 'DFWAutoLogicScn')
+
+
+def get_backend_name(backend: str = None) -> str:
+    """
+    Функция выбора реализации расчетного ядра
+    :param backend: Наименование реализации (None - из переменной окружения RASTR_BACKEND)
+    :return: Наименование реализации
+    """
+    name = backend or os.environ.get('RASTR_BACKEND', 'com')
+
+    if name not in BACKENDS:
+        raise Exception(f"Неизвестная реализация расчетного ядра {name}")
+
+    return name
+
+def create_rastr(backend: str = None) -> any:
+    """
+    Функция создания экземпляра расчетного ядра
+    :param backend: Наименование реализации ('com' - RUSTab, 'stub' - заглушка на Python)
+    :return: Объект с интерфейсом Astra.Rastr
+    """
+    if get_backend_name(backend) == 'stub':
+        return StubRastr()
+
+    import win32com.client
+    return win32com.client.Dispatch("Astra.Rastr")
+
+class LazyRastr:
+    """
+    Класс, откладывающий создание экземпляра расчетного ядра до первого обращения.
+    Объект COM привязан к потоку, в котором создан: обращаться к нему следует только из потока,
+    не вызывающего uninitialize_thread (SolverThread или рабочий процесс SolverPool)
+    """
+
+    def __init__(self, backend: str = None):
+        """
+        Инициализация класса.
+
+        :param backend: Наименование реализации (None - из переменной окружения RASTR_BACKEND).
+        """
+        object.__setattr__(self, '_backend', backend)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def instance(self) -> any:
+        """
+        Метод получения экземпляра расчетного ядра с созданием при первом обращении.
+
+        :return: Объект с интерфейсом Astra.Rastr.
+        """
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, '_instance', create_rastr(self._backend))
+
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self.instance(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.instance(), name, value)
+
+def initialize_thread(backend: str = None) -> None:
+    """
+    Функция подготовки потока к работе с расчетным ядром
+    :param backend: Наименование реализации
+    :return: None
+    """
+    if get_backend_name(backend) == 'com':
+        import pythoncom
+        pythoncom.CoInitialize()
+
+def uninitialize_thread(backend: str = None) -> None:
+    """
+    Функция освобождения ресурсов потока после работы с расчетным ядром.
+    Объекты COM, созданные в потоке, после вызова недействительны
+    :param backend: Наименование реализации
+    :return: None
+    """
+    if get_backend_name(backend) == 'com':
+        import pythoncom
+        pythoncom.CoUninitialize()
+
+class SolverThread:
+    """
+    Класс долгоживущего потока - владельца расчетного ядра.
+    Поток инициализирует COM один раз и не освобождает его: созданный в нем объект RUSTab
+    остается действительным, а все расчеты выполняются в нем по очереди
+    """
+
+    def __init__(self, backend: str = None, name: str = 'solver'):
+        """
+        Инициализация класса.
+
+        :param backend: Наименование реализации (None - из переменной окружения RASTR_BACKEND).
+        :param name: Имя потока.
+        """
+        self.backend = backend
+        self.name = name
+        self.tasks = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _start(self) -> None:
+        """
+        Метод запуска потока при первом задании.
+        """
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self.thread.start()
+
+    def _run(self) -> None:
+        """
+        Метод цикла потока: выполнение заданий в контексте вызвавшего потока.
+        """
+        initialize_thread(self.backend)
+
+        while True:
+            future, context, function, args, kwargs = self.tasks.get()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(context.run(function, *args, **kwargs))
+
+            except BaseException as ex:
+                future.set_exception(ex)
+
+    def call(self, function, *args, **kwargs) -> any:
+        """
+        Метод выполнения функции в потоке-владельце с ожиданием результата.
+        Вызов из самого потока выполняется сразу, без очереди.
+
+        :param function: Вызываемая функция.
+        :return: Результат функции; исключение функции передается вызывающему.
+        """
+        if threading.current_thread() is self.thread:
+            return function(*args, **kwargs)
+
+        self._start()
+
+        # Контекст передается для замеров этапов текущего запроса (metrics.stage_timer)
+        future = Future()
+        self.tasks.put((future, contextvars.copy_context(), function, args, kwargs))
+
+        return future.result()
+
+
+class StubColumn:
+    """
+    Класс, описывающий столбец таблицы заглушки
+    """
+
+    def __init__(self, table, name):
+        """
+        Инициализация класса.
+
+        :param table: Таблица, которой принадлежит столбец.
+        :param name: Наименование столбца.
+        """
+        self.table = table
+        self.name = name
+
+    @property
+    def values(self) -> list:
+        """
+        Значения столбца, дополненные до размера таблицы.
+        """
+        values = self.table.data.setdefault(self.name, [])
+        values.extend([0] * (self.table.Count - len(values)))
+        return values
+
+    def Z(self, index):
+        """Значение ячейки"""
+        return self.values[index]
+
+    def SetZ(self, index, value):
+        """Запись значения ячейки"""
+        self.values[index] = value
+
+    def get_ZN(self, index):
+        """Значение ячейки"""
+        return self.values[index]
+
+    def set_ZN(self, index, value):
+        """Запись значения ячейки"""
+        self.values[index] = value
+
+    def SetZN(self, index, value):
+        """Запись значения ячейки"""
+        self.values[index] = value
+
+
+class StubCollection:
+    """
+    Класс, описывающий коллекцию COM с доступом через вызов и Item
+    """
+
+    def __init__(self, factory):
+        """
+        Инициализация класса.
+
+        :param factory: Функция получения элемента по имени.
+        """
+        self.factory = factory
+
+    def __call__(self, name):
+        """Элемент коллекции по имени"""
+        return self.factory(name)
+
+    def Item(self, name):
+        """Элемент коллекции по имени"""
+        return self.factory(name)
+
+
+class StubTable:
+    """
+    Класс, описывающий таблицу заглушки
+    """
+
+    def __init__(self, name, data=None):
+        """
+        Инициализация класса.
+
+        :param name: Наименование таблицы.
+        :param data: Словарь {столбец: список значений}.
+        """
+        self.name = name
+        self.data = data or {}
+        self.Count = max((len(values) for values in self.data.values()), default=0)
+        self.Cols = StubCollection(self._column)
+
+    def _column(self, name):
+        """Столбец таблицы по имени"""
+        # Регистр наименований столбцов в RUSTab не важен
+        for existing in self.data:
+            if existing.lower() == name.lower():
+                return StubColumn(self, existing)
+
+        return StubColumn(self, name)
+
+    @property
+    def Size(self):
+        """Количество строк таблицы"""
+        return self.Count
+
+    @Size.setter
+    def Size(self, size):
+        """Изменение количества строк таблицы"""
+        self.Count = size
+
+        for values in self.data.values():
+            del values[size:]
+
+    def AddRow(self):
+        """Добавление строки в конец таблицы"""
+        self.Count += 1
+
+    def ReadSafeArray(self, mode, columns, selection):
+        """Чтение столбцов таблицы построчно"""
+        column_items = [self._column(name) for name in columns.split(",")]
+        return tuple(tuple(column.Z(index) for column in column_items)
+                     for index in range(self.Count))
+
+    def WriteSafeArray(self, mode, columns, array):
+        """Запись строк массива в таблицу с первой строки"""
+        column_items = [self._column(name) for name in columns.split(",")]
+        self.Count = max(self.Count, len(array))
+
+        for index, row in enumerate(array):
+            for column, value in zip(column_items, row):
+                column.SetZ(index, value)
+
+
+class StubDynamic:
+    """
+    Класс, описывающий расчет переходного процесса заглушки
+    """
+
+    def __init__(self, rastr):
+        """
+        Инициализация класса.
+
+        :param rastr: Экземпляр заглушки расчетного ядра.
+        """
+        self.rastr = rastr
+
+    def Run(self):
+        """Расчет переходного процесса: формирование оси времени по настройкам com_dynamics"""
+        settings = self.rastr.Tables("com_dynamics")
+        duration = settings.Cols("Tras").Z(0) if settings.Count else 1.0
+        step = settings.Cols("Hout").Z(0) if settings.Count else 0.01
+
+        self.rastr.time = [step * index for index in range(int(round(duration / step)) + 1)]
+        return 0
+
+
+class StubRastr:
+    """
+    Класс, заменяющий RUSTab для запуска без Windows.
+    Файлы режимов хранятся в JSON вида {таблица: {столбец: [значения]}},
+    переходные процессы синтезируются как затухающие колебания.
+    """
+
+    def __init__(self):
+        """
+        Инициализация класса.
+        """
+        self.tables = {}
+        self.time = []
+        self.Tables = StubCollection(self._table)
+
+    def _table(self, name):
+        """Таблица рабочей области по имени"""
+        return self.tables.setdefault(name, StubTable(name))
+
+    def Load(self, mode, file_path, shablon):
+        """Загрузка таблиц из JSON-файла"""
+        if not os.path.isfile(file_path):
+            raise Exception(f"Файла {file_path} не существует")
+
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                content = json.load(file)
+
+        except ValueError:
+            # Двоичные файлы RUSTab заглушкой не разбираются
+            return
+
+        for name, data in content.items():
+            self.tables[name] = StubTable(name, {column: list(values) for column, values in data.items()})
+
+    def Save(self, file_name, shablon):
+        """Сохранение таблиц в JSON-файл"""
+        content = {name: {column: StubColumn(table, column).values for column in table.data}
+                   for name, table in self.tables.items()}
+
+        with open(file_name, "w", encoding="utf-8") as file:
+            json.dump(content, file, ensure_ascii=False)
+
+    def NewFile(self, shablon):
+        """Создание нового файла: сброс таблиц сценария для шаблона .scn"""
+        if shablon.lower().endswith(".scn"):
+            for name in SCENARIO_TABLES:
+                self.tables.pop(name, None)
+
+    def rgm(self, parameters):
+        """Расчет установившегося режима (всегда успешный)"""
+        return 0
+
+    def FWDynamic(self):
+        """Объект расчета переходного процесса"""
+        return StubDynamic(self)
+
+    def GetChainedGraphSnapshot(self, table_name, parameter, index, mode):
+        """Переходный процесс в виде пар (значение, время)"""
+        # Затухающие колебания с параметрами, зависящими от индекса строки
+        amplitude = 10.0 + index % 7
+        damping = 0.5 + (index % 5) * 0.1
+        frequency = 2 * math.pi * (1.0 + (index % 3) * 0.2)
+
+        return tuple((amplitude * math.exp(-damping * t) * math.sin(frequency * t), t)
+                     for t in self.time)
@@ -0,0 +1,133 @@
+import itertools
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+
+import solver_backend
+
+
+def _init_worker(backend: str) -> None:
+    """
+    Функция инициализации рабочего процесса: собственный экземпляр расчетного ядра
+    :param backend: Наименование реализации расчетного ядра
+    :return: None
+    """
+    solver_backend.initialize_thread(backend)
+
+    # Модуль, импортированный позже, создаст ядро выбранной реализации
+    os.environ['RASTR_BACKEND'] = backend
+
+    # Модуль, унаследованный от родительского процесса, переключается явно
+    if 'rustab_interaction' in sys.modules:
+        sys.modules['rustab_interaction'].set_backend(backend)
+
+def simulate_scenario(task: dict) -> np.ndarray:
+    """
+    Функция расчета одного сценария в рабочем процессе
+    :param task: Словарь с ключами rst_file, scn_file, dfw_file, shablon_scn, kpr_file,
+                 name, data_set, name_support, set_support, dynamic (параметры calculate_dynamic)
+                 и channel (таблица, параметр, номер элемента) или channels
+                 {наименование столбца: (таблица, параметр, номер элемента)}
+    :return: Массив строк переходного процесса (значения каналов, время)
+    """
+    import rustab_interaction
+
+    rustab_interaction.file_prepare(task['rst_file'], task['scn_file'], task['dfw_file'],
+                                    task['shablon_scn'], task['kpr_file'], task['name'],
+                                    task['data_set'], task['name_support'], task['set_support'])
+
+    dynamic = task['dynamic']
+    rustab_interaction.calculate_dynamic(dynamic['input_width'], dynamic.get('start_step', 0.01),
+                                         dynamic.get('min_step', 0.001), dynamic.get('max_step', 0.5),
+                                         dynamic.get('out_step', 0.01))
+
+    # Несколько каналов извлекаются в один массив со временем в последнем столбце
+    if 'channels' in task:
+        return rustab_interaction.get_transient_channels(task['channels'])[0]
+
+    table, parameter, key = task['channel']
+    return rustab_interaction.get_transient_array(table, parameter, key)
+
+
+class SolverPool:
+    """
+    Класс, описывающий пул процессов с изолированными экземплярами расчетного ядра
+    """
+
+    def __init__(self, processes: int = None, backend: str = None):
+        """
+        Инициализация класса.
+
+        :param processes: Количество рабочих процессов (по умолчанию - число ядер).
+        :param backend: Наименование реализации расчетного ядра.
+        """
+        self.backend = solver_backend.get_backend_name(backend)
+        self.processes = processes or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.processes,
+                                            initializer=_init_worker,
+                                            initargs=(self.backend,))
+
+    def submit(self, func: Callable, *args, **kwargs):
+        """
+        Метод запуска функции в рабочем процессе.
+
+        :param func: Функция уровня модуля.
+        :return: Объект Future с результатом.
+        """
+        return self.executor.submit(func, *args, **kwargs)
+
+    def map_unordered(self, func: Callable, tasks: Iterable) -> Iterator[dict]:
+        """
+        Метод параллельного выполнения заданий с выдачей результатов по мере готовности.
+        Задания берутся из итератора порциями, не более двух на рабочий процесс.
+
+        :param func: Функция уровня модуля, принимающая задание.
+        :param tasks: Задания.
+        :return: Генератор словарей {'task': задание, 'result': результат, 'error': текст ошибки}.
+        """
+        tasks = iter(tasks)
+        futures = {}
+
+        while True:
+            for task in itertools.islice(tasks, 2 * self.processes - len(futures)):
+                futures[self.executor.submit(func, task)] = task
+
+            if not futures:
+                return
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                task = futures.pop(future)
+
+                try:
+                    yield {'task': task, 'result': future.result(), 'error': None}
+
+                except Exception as ex:
+                    yield {'task': task, 'result': None, 'error': str(ex)}
+
+    def simulate(self, tasks: Iterable[dict]) -> Iterator[dict]:
+        """
+        Метод параллельного расчета сценариев.
+
+        :param tasks: Задания в формате simulate_scenario.
+        :return: Генератор результатов по мере завершения расчетов.
+        """
+        return self.map_unordered(simulate_scenario, tasks)
+
+    def close(self) -> None:
+        """
+        Метод остановки рабочих процессов.
+
+        :return: None
+        """
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
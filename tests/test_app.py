@@ -0,0 +1,93 @@
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+# Параметры моделей читаются из SQLite в памяти, а не из PostgreSQL
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+import app as service
+import rustab_interaction
+import trajectory_io
+from model_metadata import ModelMetadataCache
+from result_cache import ResultCache
+from solver_backend import SolverThread
+
+# Окно наблюдения и длина окна модели model.h5
+INPUT_WIDTH, DATA_IN_FRAME = 36, 140
+
+
+@pytest.fixture
+def client(stub_case, tmp_path, monkeypatch):
+    """
+    Фикстура клиента приложения на заглушке расчетного ядра
+    :return: Тестовый клиент Flask
+    """
+    # Режим с генераторами станции: из результата читаются их мощности
+    with open(stub_case['rst_file'], encoding='utf-8') as file:
+        regime = json.load(file)
+
+    regime['Generator'] = {'Num': list(service.BOGES_GENERATORS.values()),
+                           'P': [300.0] * len(service.BOGES_GENERATORS)}
+
+    with open(stub_case['rst_file'], 'w', encoding='utf-8') as file:
+        json.dump(regime, file)
+
+    rustab_interaction.set_backend('stub')
+    monkeypatch.setattr(service, 'solver_thread', SolverThread('stub'))
+    monkeypatch.setattr(service, 'model_metadata', ModelMetadataCache(
+        lambda: [{'name': 'model', 'input_width': INPUT_WIDTH, 'data_in_frame': DATA_IN_FRAME}]))
+    monkeypatch.setattr(service, 'result_cache', ResultCache(str(tmp_path / 'cache'), 64 * 1024 * 1024))
+    monkeypatch.setattr(service, 'SHABLON_DFW', stub_case['dfw_file'])
+    monkeypatch.setattr(service, 'SHABLON_SCN', stub_case['shablon_scn'])
+    monkeypatch.setattr(service, 'SHABLON_KPR', stub_case['kpr_file'])
+    monkeypatch.setattr(rustab_interaction, 'result_path',
+                        lambda plant, index, output_format='npy': str(tmp_path / f"{index}.{output_format}"))
+
+    return service.app.test_client()
+
+def transient_request(stub_case, **extra) -> dict:
+    return dict({'rst_file': stub_case['rst_file'], 'scn_file': stub_case['scn_file'], 'input_width': 1.0},
+                **extra)
+
+def test_sync_transients_get_own_result_files(client, stub_case):
+    first = client.post('/get-transient', json=transient_request(stub_case)).json['path']
+    second = client.post('/get-transient', json=transient_request(stub_case)).json['path']
+
+    # Повторный запрос берет результат из кэша в собственный файл
+    assert first != second
+    np.testing.assert_array_equal(trajectory_io.read_trajectory(first), trajectory_io.read_trajectory(second))
+    assert (service.result_cache.stats()['hits'], service.result_cache.stats()['misses']) == (1, 1)
+
+def test_forecast_returns_observed_window_in_physical_units(client, stub_case):
+    response = client.post('/forecast', json={'rst_file': stub_case['rst_file'],
+                                              'scn_file': stub_case['scn_file'], 'name': 'model'})
+
+    simulated = service.simulate_transient(stub_case['rst_file'], stub_case['scn_file'],
+                                           INPUT_WIDTH * service.OUT_STEP)
+    observed = np.array(response.json['observed'])
+
+    # Угол окна наблюдения совпадает с рассчитанным, а не нормализован в [0, 1]
+    assert response.status_code == 200
+    assert observed.shape == (INPUT_WIDTH, 4)
+    np.testing.assert_allclose(observed[:, 0], simulated[:INPUT_WIDTH, 0], rtol=1e-5, atol=1e-4)
+    assert np.array(response.json['predicted']).shape == (DATA_IN_FRAME - INPUT_WIDTH, 4)
+
+def test_timings_are_not_carried_into_next_request(client, stub_case):
+    timed = client.post('/get-transient?timings=1', json=transient_request(stub_case))
+    queued = client.post('/get-transient', json=transient_request(stub_case, **{'async': True}))
+
+    # Задание дожидается завершения, пока заглушки расчетного ядра подменены
+    deadline = time.monotonic() + 30
+    while client.get(queued.json['status_url']).json['status'] not in ('done', 'failed'):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    status = client.get(queued.json['status_url'])
+
+    assert 'calculate_dynamic' in timed.json['timings']
+    assert 'timings' not in queued.json
+    assert 'timings' not in status.json
+    assert status.json['status'] == 'done'
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import trajectory_io
+from dataset_builder import DatasetBuilder
+from features import FEATURE_COLUMNS
+
+# Окно из 10 точек с шагом 5: процесс из 50 точек дает 9 окон, шард - 5 окон
+INPUT_WIDTH, DATA_IN_FRAME, STRIDE, POINTS = 6, 10, 5, 50
+
+
+def make_sources(directory, count):
+    sources = []
+
+    for number in range(count):
+        # Первый признак кодирует процесс и точку: окно узнается по первому значению
+        data = np.zeros((POINTS, len(FEATURE_COLUMNS)))
+        data[:, 0] = number * 1000 + np.arange(POINTS)
+
+        path = trajectory_io.save_trajectory(str(directory / f"source_{number}.npy"), data, FEATURE_COLUMNS)
+        sources.append((f"source_{number}", path))
+
+    return sources
+
+def make_builder(directory, **parameters):
+    return DatasetBuilder(str(directory), INPUT_WIDTH, DATA_IN_FRAME, shard_size=5, stride=STRIDE,
+                          validation_fraction=parameters.pop('validation_fraction', 0.3), **parameters)
+
+def read_windows(directory, manifest):
+    starts = []
+
+    for shard in manifest['shards']:
+        with np.load(directory / shard['file']) as content:
+            assert len(content['x']) == len(content['y']) == shard['count']
+            starts.extend(content['x'][:, 0, 0].tolist())
+
+    return starts
+
+def test_interrupted_build_resumes_without_duplicates(tmp_path):
+    sources = make_sources(tmp_path, 7)
+    expected = sorted(number * 1000 + start for number in range(7) for start in range(0, 41, STRIDE))
+
+    # Прерывание после четырех процессов: неполные шарды и опись не дописаны
+    make_builder(tmp_path / 'dataset').build(sources[:4])
+
+    builder = make_builder(tmp_path / 'dataset')
+
+    # Окна одного из процессов успели записаться в шарды лишь частично
+    assert builder.manifest['partial']
+
+    builder.build(sources)
+    manifest = builder.close()
+
+    assert sorted(read_windows(tmp_path / 'dataset', manifest)) == expected
+    assert sorted(manifest['sources']) == sorted(source_id for source_id, _ in sources)
+    assert manifest['partial'] == {}
+
+def test_split_is_deterministic_for_seed(tmp_path):
+    source_ids = [f"source_{number}" for number in range(200)]
+
+    first = [make_builder(tmp_path / 'a', seed=7).split(source_id) for source_id in source_ids]
+    second = [make_builder(tmp_path / 'b', seed=7).split(source_id) for source_id in source_ids]
+    other = [make_builder(tmp_path / 'c', seed=8).split(source_id) for source_id in source_ids]
+
+    assert first == second
+    assert first != other
+    assert 0.15 < first.count('validation') / len(first) < 0.45
+
+def test_resume_with_other_parameters_fails(tmp_path):
+    make_builder(tmp_path).close()
+
+    with pytest.raises(Exception, match="stride"):
+        DatasetBuilder(str(tmp_path), INPUT_WIDTH, DATA_IN_FRAME, shard_size=5, stride=STRIDE + 1,
+                       validation_fraction=0.3)
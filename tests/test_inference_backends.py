@@ -0,0 +1,24 @@
+import pytest
+
+from inference_backends import ExportedEngine, create_engine
+
+
+def make_config(tmp_path, backend):
+    return {'INFERENCE_BACKEND': backend, 'INFERENCE_QUANTIZATION': 'int8', 'INFERENCE_THREADS': 1,
+            'MODEL_DIR': str(tmp_path), 'MODEL_DEFAULT_ARTIFACT': str(tmp_path / 'model.h5'),
+            'MODEL_ARTIFACTS': {}, 'MODEL_CACHE_SIZE': 2}
+
+def test_exported_engine_requires_load_and_run():
+    with pytest.raises(TypeError):
+        ExportedEngine('', 'model.h5')
+
+@pytest.mark.parametrize('backend', ['onnx', 'tflite'])
+def test_create_engine_without_exported_model_fails(tmp_path, backend):
+    with pytest.raises(Exception, match=f"model.int8.{backend}"):
+        create_engine(make_config(tmp_path, backend))
+
+def test_create_engine_with_exported_model(tmp_path):
+    # Файл только проверяется на наличие: сеанс создается при первом прогнозе
+    (tmp_path / 'model.int8.onnx').write_bytes(b'')
+
+    assert create_engine(make_config(tmp_path, 'onnx')).stats()['quantization'] == 'int8'
@@ -0,0 +1,52 @@
+import threading
+import time
+
+import pytest
+
+from model_metadata import ModelMetadataCache
+
+ROW = {'name': 'm', 'input_width': 5, 'data_in_frame': 10}
+
+
+def test_concurrent_stale_lookups_refresh_once():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return [ROW]
+
+    cache = ModelMetadataCache(loader, ttl=60)
+    threads = [threading.Thread(target=cache.get, args=('m',)) for _ in range(8)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert cache.get('m') == ROW
+
+def test_failed_refresh_keeps_previous_entries(caplog):
+    rows = [[ROW]]
+
+    def loader():
+        if not rows:
+            raise ConnectionError("БД недоступна")
+
+        return rows.pop()
+
+    cache = ModelMetadataCache(loader, ttl=60)
+    assert cache.get('m') == ROW
+
+    cache.invalidate()
+    assert cache.get('m') == ROW
+    assert "БД недоступна" in caplog.text
+
+def test_first_load_failure_raises():
+    def loader():
+        raise ConnectionError("БД недоступна")
+
+    with pytest.raises(Exception):
+        ModelMetadataCache(loader).get('m')
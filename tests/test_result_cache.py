@@ -0,0 +1,29 @@
+import numpy as np
+
+import trajectory_io
+from result_cache import ResultCache
+
+
+def make_trajectory(path, value):
+    return trajectory_io.save_trajectory(str(path), np.full((10, 2), value), ['delta', 't'], 0.01)
+
+def test_get_into_copies_result_with_metadata(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=1024 * 1024)
+    cache.put('a', make_trajectory(tmp_path / 'a.npy', 1.0))
+
+    destination = str(tmp_path / 'out.npy')
+
+    assert cache.get_into('a', destination)
+    np.testing.assert_array_equal(trajectory_io.read_trajectory(destination), np.ones((10, 2)))
+    assert trajectory_io.read_metadata(destination)['columns'] == ['delta', 't']
+    assert cache.stats()['hits'] == 1
+
+def test_get_into_evicted_result_is_a_miss(tmp_path):
+    # Объем кэша меньше двух результатов: второй вытесняет первый
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes=300)
+    cache.put('a', make_trajectory(tmp_path / 'a.npy', 1.0))
+    cache.put('b', make_trajectory(tmp_path / 'b.npy', 2.0))
+
+    assert not cache.get_into('a', str(tmp_path / 'out.npy'))
+    assert cache.get_into('b', str(tmp_path / 'out.npy'))
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 1)
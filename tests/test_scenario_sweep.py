@@ -0,0 +1,34 @@
+import json
+
+import numpy as np
+import pytest
+
+from scenario_sweep import expand_grid, sweep_tasks
+
+
+def test_line_sets_are_spread_into_line_parameters():
+    grid = {'shunt': [1.0, 2.0], 'lines': [['L1', 'L2', 'L3', 'L4'], ['L5', 'L6', 'L7', 'L8']]}
+    params = list(expand_grid(grid, group=1))
+
+    assert len(params) == 4
+    assert params[0] == {'shunt': 1.0, 'line_1': 'L1', 'line_2': 'L2', 'line_3': 'L3', 'line_4': 'L4'}
+
+def test_flat_lines_list_is_rejected():
+    with pytest.raises(Exception, match="наборов линий"):
+        list(expand_grid({'lines': ['L1', 'L2', 'L3', 'L4']}, group=1))
+
+def test_line_set_length_checked_against_group():
+    with pytest.raises(Exception, match="5 линий"):
+        list(expand_grid({'lines': [['L1', 'L2', 'L3', 'L4']]}, group=3))
+
+def test_numpy_options_are_written_to_manifest(tmp_path):
+    grid = {'fault_node': np.array([60533014, 60533015]), 'shunt': np.float64(1.5),
+            'lines': np.array([['L1', 'L2', 'L3', 'L4']])}
+    tasks = list(sweep_tasks(1, grid, str(tmp_path), {}))
+
+    with open(tmp_path / 'scn.jsonl', encoding='utf-8') as manifest:
+        params = [json.loads(line)['params'] for line in manifest]
+
+    assert [task['params'] for task in tasks] == params
+    assert params[1] == {'fault_node': 60533015, 'shunt': 1.5,
+                         'line_1': 'L1', 'line_2': 'L2', 'line_3': 'L3', 'line_4': 'L4'}
@@ -0,0 +1,38 @@
+import numpy as np
+
+import screening
+
+
+def run_screening(normalized_peak):
+    observed = np.linspace(0.0, 100.0, 10)
+    full_runs = []
+
+    # Масштаб входа модели подобран по окну с еще одной точкой: угол до 100 град,
+    # тогда как в возвращаемом окне наблюдения - до 88.9 град
+    scaler = np.array([[0.0, -1.0, -1.0, 2000.0], [100.0, 1.0, 1.0, 2700.0]])
+
+    def observe(scenarios):
+        return [(observed[:-1], np.zeros((9, 4), dtype=np.float32), scaler) for _ in scenarios]
+
+    def predict(windows):
+        # Нормализованный выход модели: 1.0 соответствует максимуму угла масштаба
+        return np.full((1, len(windows), 5), normalized_peak)
+
+    def simulate_full(scenario):
+        full_runs.append(scenario)
+        return np.array([0.0, 200.0])
+
+    return screening.screen_contingencies(['a.scn', 'b.scn'], observe, predict, simulate_full), full_runs
+
+def test_prediction_rescaled_once_by_observation_window():
+    results, full_runs = run_screening(1.0)
+
+    assert full_runs == []
+    assert [result['predicted_peak'] for result in results] == [100.0, 100.0]
+    assert all(result['stable'] and result['source'] == 'surrogate' for result in results)
+
+def test_flagged_scenarios_are_fully_simulated():
+    results, full_runs = run_screening(1.9)
+
+    assert full_runs == ['a.scn', 'b.scn']
+    assert all(result['flags'] == ['delta_limit'] and not result['stable'] for result in results)
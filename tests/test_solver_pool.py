@@ -0,0 +1,40 @@
+import numpy as np
+
+from solver_pool import SolverPool
+
+
+def test_stub_pool_without_backend_variable(stub_case, monkeypatch):
+    # Реализация задается только аргументом пула, переменная окружения не нужна
+    monkeypatch.delenv('RASTR_BACKEND', raising=False)
+
+    with SolverPool(2, 'stub') as pool:
+        results = list(pool.simulate([stub_case] * 4))
+
+    assert [result['error'] for result in results] == [None] * 4
+
+    for result in results:
+        assert result['result'].shape == (101, 2)
+        np.testing.assert_allclose(result['result'][:, 1], np.arange(101) * 0.01)
+
+def test_stub_pool_reports_task_errors(stub_case, monkeypatch):
+    monkeypatch.delenv('RASTR_BACKEND', raising=False)
+    broken = dict(stub_case, rst_file=stub_case['rst_file'] + '.missing')
+
+    with SolverPool(1, 'stub') as pool:
+        results = list(pool.simulate([broken, stub_case]))
+
+    errors = {result['task']['rst_file']: result['error'] for result in results}
+
+    assert errors[stub_case['rst_file']] is None
+    assert errors[broken['rst_file']]
+
+def test_stub_pool_multiple_channels(stub_case, monkeypatch):
+    monkeypatch.delenv('RASTR_BACKEND', raising=False)
+    task = dict(stub_case, channels={'delta': ('Generator', 'Delta', 60533014),
+                                     'p_60533008': ('Generator', 'P', 60533008)})
+
+    with SolverPool(1, 'stub') as pool:
+        [result] = list(pool.simulate([task]))
+
+    assert result['error'] is None
+    assert result['result'].shape == (101, 3)
@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+import metrics
+from solver_backend import LazyRastr, SolverThread
+
+
+def test_calls_run_in_one_owner_thread():
+    solver_thread = SolverThread('stub')
+    callers = [threading.Thread(target=solver_thread.call, args=(lambda: None,)) for _ in range(4)]
+
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+
+    assert solver_thread.call(threading.current_thread) is solver_thread.thread
+    assert solver_thread.thread is not threading.current_thread()
+
+def test_rastr_created_in_owner_thread_stays_usable():
+    solver_thread = SolverThread('stub')
+    rastr = LazyRastr('stub')
+
+    # Объект создается при первом обращении в потоке-владельце и используется повторно
+    first = solver_thread.call(rastr.instance)
+    caller = threading.Thread(target=solver_thread.call, args=(lambda: rastr.rgm(''),))
+    caller.start()
+    caller.join()
+
+    assert solver_thread.call(rastr.instance) is first
+
+def test_errors_and_request_timings_reach_caller():
+    solver_thread = SolverThread('stub')
+    metrics.start_request_timings()
+
+    def stage():
+        with metrics.stage_timer('calculate_dynamic'):
+            raise Exception("Расчет завершился ошибкой")
+
+    with pytest.raises(Exception, match="ошибкой"):
+        solver_thread.call(stage)
+
+    assert 'calculate_dynamic' in metrics.get_request_timings()
+
+def test_nested_call_runs_inline():
+    solver_thread = SolverThread('stub')
+
+    assert solver_thread.call(lambda: solver_thread.call(lambda: 42)) == 42
@@ -0,0 +1,188 @@
+import csv
+import io
+import itertools
+import json
+import os
+import shutil
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Форматы промежуточных файлов переходного процесса
+BINARY_EXTENSION = '.npy'
+CSV_EXTENSION = '.csv'
+
+
+def metadata_path(path: str) -> str:
+    """
+    Функция получения пути к файлу описания переходного процесса
+    :param path: Путь к файлу переходного процесса
+    :return: Путь к JSON-файлу описания
+    """
+    return os.path.splitext(path)[0] + '.json'
+
+def is_binary(path: str) -> bool:
+    """
+    Функция проверки двоичного формата файла переходного процесса
+    :param path: Путь к файлу
+    :return: True для .npy
+    """
+    return os.path.splitext(path)[1].lower() == BINARY_EXTENSION
+
+def save_trajectory(path: str, data: np.ndarray, columns: list,
+                    step: float = None, **metadata) -> str:
+    """
+    Функция сохранения переходного процесса в двоичном формате
+    (float32 .npy с описанием столбцов и шага в JSON рядом с файлом)
+    :param path: Путь к файлу .npy
+    :param data: Массив размерности (точки, столбцы)
+    :param columns: Наименования столбцов
+    :param step: Шаг по времени, с
+    :return: Путь к файлу
+    """
+    data = np.ascontiguousarray(data, dtype=np.float32)
+
+    if data.ndim != 2 or data.shape[1] != len(columns):
+        raise ValueError(f"Размерность {data.shape} не соответствует столбцам {columns}")
+
+    np.save(path, data, allow_pickle=False)
+    write_metadata(path, **dict(metadata, columns=list(columns), step=step, rows=data.shape[0]))
+
+    return path
+
+def write_metadata(path: str, **metadata) -> None:
+    """
+    Функция записи описания переходного процесса в JSON рядом с файлом
+    :param path: Путь к файлу переходного процесса (.npy или .csv)
+    :return: None
+    """
+    with open(metadata_path(path), "w", encoding="utf-8") as file:
+        json.dump(metadata, file, ensure_ascii=False)
+
+def read_metadata(path: str) -> dict:
+    """
+    Функция чтения описания двоичного переходного процесса
+    :param path: Путь к файлу .npy
+    :return: Словарь описания
+    """
+    with open(metadata_path(path), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+def read_scaler(path: str) -> Optional[np.ndarray]:
+    """
+    Функция чтения масштаба признаков, сохраненного при предобработке
+    :param path: Путь к файлу переходного процесса (.npy или .csv)
+    :return: Массив (2, признаки): минимумы и максимумы; None, если масштаб не сохранен
+    """
+    try:
+        scaler = read_metadata(path).get('scaler')
+
+    except FileNotFoundError:
+        return None
+
+    return None if scaler is None else np.asarray(scaler, dtype=np.float64)
+
+def load_trajectory(path: str, mmap: bool = True) -> Tuple[np.ndarray, dict]:
+    """
+    Функция загрузки двоичного переходного процесса
+    :param path: Путь к файлу .npy
+    :param mmap: Отображение файла в память без чтения целиком
+    :return: Массив и словарь описания
+    """
+    data = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+    return data, read_metadata(path)
+
+def _column_positions(names: list, columns: list) -> list:
+    """
+    Функция получения номеров столбцов по наименованиям или номерам
+    :param names: Наименования всех столбцов файла
+    :param columns: Наименования или номера выбранных столбцов
+    :return: Номера столбцов
+    """
+    positions = []
+
+    for column in columns:
+        if isinstance(column, str):
+            if column not in names:
+                raise ValueError(f"Столбец {column} отсутствует в файле, есть {names}")
+
+            positions.append(names.index(column))
+
+        else:
+            positions.append(int(column))
+
+    return positions
+
+def read_csv_trajectory(path: str, rows: int = None, columns: list = None) -> Tuple[np.ndarray, list]:
+    """
+    Функция чтения переходного процесса из CSV (разделитель ';', десятичная запятая).
+    Строки после rows не читаются
+    :param path: Путь к файлу CSV
+    :param rows: Количество первых читаемых строк (None - все)
+    :param columns: Наименования или номера читаемых столбцов (None - все)
+    :return: Массив и наименования прочитанных столбцов
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        names = file.readline().strip().split(';')
+        lines = itertools.islice(file, rows)
+        text = ''.join(lines).replace(',', '.')
+
+    positions = _column_positions(names, columns) if columns is not None else list(range(len(names)))
+
+    data = np.loadtxt(io.StringIO(text), delimiter=';', usecols=positions,
+                      dtype=np.float32, ndmin=2)
+
+    return data.reshape(-1, len(positions)), [names[position] for position in positions]
+
+def read_trajectory(path: str, rows: int = None, columns: list = None) -> np.ndarray:
+    """
+    Функция чтения переходного процесса в непрерывный массив float32.
+    Двоичные файлы отображаются в память, копируется только выбранная часть
+    :param path: Путь к файлу .npy или .csv
+    :param rows: Количество первых читаемых строк (None - все)
+    :param columns: Наименования или номера читаемых столбцов (None - все)
+    :return: Массив размерности (строки, столбцы)
+    :raises FileNotFoundError: Файл не существует
+    :raises ValueError: Файл не удалось разобрать
+    """
+    if not is_binary(path):
+        return read_csv_trajectory(path, rows, columns)[0]
+
+    data, metadata = load_trajectory(path)
+    data = data[:rows]
+
+    if columns is not None:
+        data = data[:, _column_positions(metadata['columns'], columns)]
+
+    return np.ascontiguousarray(data, dtype=np.float32)
+
+def export_csv(path: str, csv_path: str = None) -> str:
+    """
+    Функция выгрузки двоичного переходного процесса в CSV
+    (разделитель ';', десятичная запятая)
+    :param path: Путь к файлу .npy
+    :param csv_path: Путь к файлу CSV (по умолчанию рядом с .npy)
+    :return: Путь к файлу CSV
+    """
+    data, metadata = load_trajectory(path)
+    csv_path = csv_path or os.path.splitext(path)[0] + CSV_EXTENSION
+
+    with open(csv_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file, delimiter=';')
+        writer.writerow(metadata['columns'])
+
+        for row in data:
+            writer.writerow([f"{value:.6f}".replace('.', ',') for value in row])
+
+    return csv_path
+
+def copy_trajectory(path: str, destination: str) -> str:
+    """
+    Функция копирования двоичного переходного процесса вместе с описанием
+    :param path: Путь к исходному файлу .npy
+    :param destination: Путь к новому файлу .npy
+    :return: Путь к новому файлу
+    """
+    shutil.copyfile(path, destination)
+    shutil.copyfile(metadata_path(path), metadata_path(destination))
+    return destination
@@ -1,4 +1,3 @@
-import win32com
 import rustab_interaction
 
 if __name__ == '__main__':